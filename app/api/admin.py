@@ -0,0 +1,53 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from app.core.config import settings
+from app.services.data_reloader import data_reloader
+from app.utils.cache import invalidate_cache
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """管理接口需在 X-Admin-Token 头中携带 ADMIN_TOKEN；未配置 ADMIN_TOKEN 时一律拒绝。"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="管理接口未启用")
+    if not x_admin_token or not secrets.compare_digest(
+        x_admin_token.encode("utf-8"), settings.ADMIN_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=401, detail="管理令牌无效")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])
+
+
+class CacheInvalidateRequest(BaseModel):
+    name: Optional[str] = None  # 缓存名称，为空时失效全部缓存
+
+
+class CacheInvalidateResponse(BaseModel):
+    invalidated: List[str]
+
+
+@router.post("/admin/cache/invalidate", response_model=CacheInvalidateResponse)
+async def invalidate(req: CacheInvalidateRequest):
+    names = invalidate_cache(req.name)
+    if req.name and not names:
+        raise HTTPException(status_code=404, detail=f"未找到缓存: {req.name}")
+    return {"invalidated": names}
+
+
+class DataReloadResponse(BaseModel):
+    districts: int
+    circles: int
+    aliases: int
+    keyword_labels: int
+    duration_ms: float
+
+
+@router.post("/admin/reload", response_model=DataReloadResponse)
+async def reload_data():
+    """重新加载 data/ 下的地名 CSV 与 keyword_config，构建完成后原子替换，无需重启服务。"""
+    try:
+        return await data_reloader.reload("admin")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重载失败: {e}")
@@ -0,0 +1,72 @@
+# app/api/analyze.py
+
+import asyncio
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from app.models.requirement import ParsedRequirement
+from app.services.nlp_parser_local import parse_text
+from app.services.weight_infer_local import infer_weights_locally
+from app.services.segmenter import segment
+from app.services.nlp_executor import nlp_executor
+from app.services.recommender import RecommenderService
+from app.services.circle_recommender import CircleRecommenderService
+from app.api.recommendation import CommunityScore, CircleScore
+from app.utils.json_response import fast_json
+
+router = APIRouter()
+
+
+class AnalyzeRequest(BaseModel):
+    text: str  # 原始购房需求文本
+    alpha: float = 2.0
+    random_factor: Optional[float] = Field(
+        default=1.0, description="推荐结果的随机扰动因子，100分制建议0.1~1.0"
+    )
+    limit: Optional[int] = Field(default=10, description="返回推荐结果的数量")
+    seed: Optional[str] = Field(default=None, description="随机种子，相同种子结果可复现")
+    include_circles: bool = Field(default=True, description="是否同时返回板块推荐")
+
+
+class AnalyzeResponse(BaseModel):
+    parsed_requirement: ParsedRequirement
+    weights: Dict[str, float]
+    top_communities: List[CommunityScore]
+    top_circles: Optional[List[CircleScore]] = None
+
+
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(req: AnalyzeRequest):
+    """一次调用完成：需求解析 + 权重推理 + 小区/板块推荐。"""
+    text = req.text.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="text不能为空")
+
+    # 解析与权重推理共用同一次分词
+    words = await nlp_executor.run(segment, text)
+    parsed = await parse_text(text)
+    weights = await infer_weights_locally(text, alpha=req.alpha, words=words)
+    if not weights:
+        raise HTTPException(status_code=500, detail="权重推理失败")
+
+    requirement = ParsedRequirement(**parsed)
+    random_factor = req.random_factor if req.random_factor is not None else 1.0
+    limit = req.limit if req.limit is not None else 10
+    kwargs = dict(
+        weights=weights, limit=limit, random_factor=random_factor, seed=req.seed
+    )
+
+    # 小区与板块推荐并发执行
+    tasks = [RecommenderService().recommend_communities(requirement, **kwargs)]
+    if req.include_circles:
+        tasks.append(CircleRecommenderService().recommend_circles(requirement, **kwargs))
+    results = await asyncio.gather(*tasks)
+
+    return fast_json(
+        {
+            "parsed_requirement": parsed,
+            "weights": weights,
+            "top_communities": results[0],
+            "top_circles": results[1] if req.include_circles else None,
+        }
+    )
@@ -2,6 +2,7 @@ from fastapi import FastAPI, APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict
 from app.services.circle_score_service import CircleScoreService
+from app.utils.json_response import fast_json
 
 app = FastAPI()
 router = APIRouter()
@@ -21,7 +22,8 @@ async def get_circle_scores(req: CircleScoreRequest):
     if not req.circle_codes:
         raise HTTPException(status_code=400, detail="circle_codes不能为空")
     circles = await circle_score_service.get_circles_scores(req.circle_codes)
-    return {"circles": circles}
+    # 响应模型为 List[Dict]，Decimal 与常规路径一致输出为字符串
+    return fast_json({"circles": circles}, decimal=str)
 
 
 app.include_router(router, prefix="/api")
@@ -1,7 +1,9 @@
 from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from app.services.community_score_service import CommunityScoreService
+from app.utils.json_response import dumps, fast_json
 
 app = FastAPI()
 router = APIRouter()
@@ -23,7 +25,29 @@ async def get_community_scores(req: CommunityScoreRequest):
     communities = await community_score_service.get_communities_scores(
         req.community_ids
     )
-    return {"communities": communities}
+    # 响应模型为 List[Dict]，Decimal 与常规路径一致输出为字符串
+    return fast_json({"communities": communities}, decimal=str)
+
+
+async def _ndjson_lines(community_ids: List[str]) -> AsyncIterator[bytes]:
+    # 每个查询批次合并写出一次，避免每行一次 send；
+    # 编码与 /community-scores 一致（Decimal 输出为字符串）
+    async for rows in community_score_service.stream_communities_scores(community_ids):
+        if rows:
+            yield b"\n".join(dumps(row, decimal=str) for row in rows) + b"\n"
+
+
+@router.post("/community-scores/stream")
+async def stream_community_scores(req: CommunityScoreRequest):
+    """
+    导出用的流式接口：每行一个小区的 JSON（NDJSON），顺序与 community_ids 一致，
+    按批查询、边查边写，内存占用与 id 数量无关，写出期间不占用数据库连接。
+    """
+    if not req.community_ids:
+        raise HTTPException(status_code=400, detail="community_ids不能为空")
+    return StreamingResponse(
+        _ndjson_lines(req.community_ids), media_type="application/x-ndjson"
+    )
 
 
 app.include_router(router, prefix="/api")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import Any, Dict
 from app.services.market_stats_service import MarketStatsService
@@ -12,7 +12,8 @@ class MarketStatsResponse(BaseModel):
 
 @router.get("/market-stats", response_model=MarketStatsResponse)
 async def get_market_stats():
-    data = MarketStatsService.get_latest_stats()
-    if not data:
+    body = await MarketStatsService.get_latest_stats_json()
+    if not body:
         raise HTTPException(status_code=404, detail="数据文件不存在或读取失败")
-    return {"data": data}
+    # 响应体在文件加载时已序列化，直接返回
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from typing import Any, Dict
+from app.db import Database
+from app.utils import metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics() -> Dict[str, Any]:
+    return metrics.snapshot()
+
+
+@router.get("/health")
+async def health():
+    """健康检查：数据库可用时返回 200，否则返回 503。"""
+    db_ok = await Database.health_check()
+    return JSONResponse(
+        status_code=200 if db_ok else 503,
+        content={"status": "ok" if db_ok else "degraded", "database": db_ok},
+    )
@@ -6,9 +6,13 @@ from typing import List, Optional, Dict, Any
 from app.services.recommender import RecommenderService
 from app.services.circle_recommender import CircleRecommenderService
 from app.models.requirement import ParsedRequirement  # 导入 ParsedRequirement 模型
+from app.utils.json_response import fast_json
 
 router = APIRouter()
 
+# 批量接口单次最多接受的需求条数
+MAX_BATCH_SIZE = 1000
+
 
 # 请求模型：接受格式化结果和可选自定义权重
 class RecommendRequest(BaseModel):
@@ -18,6 +22,10 @@ class RecommendRequest(BaseModel):
         default=1.0, description="推荐结果的随机扰动因子，100分制建议0.1~1.0"
     )
     limit: Optional[int] = Field(default=10, description="返回推荐结果的数量")
+    seed: Optional[str] = Field(
+        default=None,
+        description="随机种子（如会话 id）；相同种子与条件返回相同排序，结果可缓存",
+    )
 
 
 # 推荐结果结构
@@ -64,6 +72,45 @@ class RecommendCircleResponse(BaseModel):
     top_circles: List[CircleScore]
 
 
+# 批量请求：多条需求一次提交，按顺序返回各自的推荐结果
+class BatchRecommendRequest(BaseModel):
+    requests: List[RecommendRequest]
+
+
+class BatchRecommendResponse(BaseModel):
+    results: List[RecommendResponse]
+
+
+class BatchRecommendCircleResponse(BaseModel):
+    results: List[RecommendCircleResponse]
+
+
+def _batch_items(req: BatchRecommendRequest) -> List[Dict[str, Any]]:
+    if not req.requests:
+        raise HTTPException(status_code=400, detail="requests不能为空")
+    if len(req.requests) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"单次批量请求不能超过{MAX_BATCH_SIZE}条"
+        )
+
+    items = []
+    for i, r in enumerate(req.requests):
+        if not r.parsed_requirement:
+            raise HTTPException(
+                status_code=400, detail=f"第{i}条缺少有效的结构化购房需求"
+            )
+        items.append(
+            {
+                "requirement": ParsedRequirement(**r.parsed_requirement),
+                "weights": r.custom_weights,
+                "random_factor": r.random_factor if r.random_factor is not None else 1.0,
+                "limit": r.limit if r.limit is not None else 10,
+                "seed": r.seed,
+            }
+        )
+    return items
+
+
 @router.post("/recommend-communities", response_model=RecommendResponse)
 async def recommend_communities(req: RecommendRequest):
     parsed = req.parsed_requirement
@@ -78,10 +125,10 @@ async def recommend_communities(req: RecommendRequest):
     recommender = RecommenderService()
     parsed = ParsedRequirement(**parsed)  # Convert dict to ParsedRequirement
     top_communities = await recommender.recommend_communities(
-        parsed, weights=weights, random_factor=random_factor, limit=limit
+        parsed, weights=weights, random_factor=random_factor, limit=limit, seed=req.seed
     )
 
-    return {"top_communities": top_communities}
+    return fast_json({"top_communities": top_communities})
 
 
 @router.post("/recommend-circles", response_model=RecommendCircleResponse)
@@ -101,6 +148,27 @@ async def recommend_circles(req: RecommendRequest):
         weights=weights,
         random_factor=random_factor,
         limit=limit,
+        seed=req.seed,
     )
 
-    return {"top_circles": top_circles}
+    return fast_json({"top_circles": top_circles})
+
+
+@router.post("/recommend-communities/batch", response_model=BatchRecommendResponse)
+async def recommend_communities_batch(req: BatchRecommendRequest):
+    items = _batch_items(req)
+    recommender = RecommenderService()
+    results = await recommender.recommend_communities_batch(items)
+    return fast_json(
+        {"results": [{"top_communities": r} for r in results]}
+    )
+
+
+@router.post("/recommend-circles/batch", response_model=BatchRecommendCircleResponse)
+async def recommend_circles_batch(req: BatchRecommendRequest):
+    items = _batch_items(req)
+    recommender = CircleRecommenderService()
+    results = await recommender.recommend_circles_batch(items)
+    return fast_json(
+        {"results": [{"top_circles": r} for r in results]}
+    )
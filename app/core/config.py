@@ -4,10 +4,25 @@ import os
 load_dotenv()
 
 
+def _env_bool(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
 class Settings:
     # LLM相关配置
     DEEPSEEK_API_KEY: str = os.getenv("DEEPSEEK_API_KEY")
     DEEPSEEK_API_URL: str = os.getenv("DEEPSEEK_API_URL")
+    DEEPSEEK_TIMEOUT_SECONDS: float = float(os.getenv("DEEPSEEK_TIMEOUT_SECONDS", "30"))
+    # 连接池与并发：长连接复用、最大连接数、同时在途的 LLM 调用上限
+    DEEPSEEK_MAX_CONNECTIONS: int = int(os.getenv("DEEPSEEK_MAX_CONNECTIONS", "20"))
+    DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+    DEEPSEEK_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("DEEPSEEK_KEEPALIVE_EXPIRY_SECONDS", "60")
+    )
+    DEEPSEEK_HTTP2: bool = _env_bool("DEEPSEEK_HTTP2", "false")
+    DEEPSEEK_MAX_CONCURRENCY: int = int(os.getenv("DEEPSEEK_MAX_CONCURRENCY", "8"))
 
     # 数据库配置
     DB_USER: str = os.getenv("DB_USER", "postgres")
@@ -15,6 +30,22 @@ class Settings:
     DB_HOST: str = os.getenv("DB_HOST", "localhost")
     DB_PORT: str = os.getenv("DB_PORT", "5432")
     DB_NAME: str = os.getenv("DB_NAME", "realtor")
+    # 连接池大小、获取连接超时、单条查询超时（秒）；连接空闲超过该时长会被关闭重建
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+    DB_POOL_MAX_SIZE: int = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_ACQUIRE_TIMEOUT_SECONDS: float = float(os.getenv("DB_ACQUIRE_TIMEOUT_SECONDS", "10"))
+    DB_COMMAND_TIMEOUT_SECONDS: float = float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", "30"))
+    DB_MAX_INACTIVE_CONNECTION_LIFETIME: float = float(
+        os.getenv("DB_MAX_INACTIVE_CONNECTION_LIFETIME", "300")
+    )
+    # 建连时下发的会话参数：短查询为主，关闭 JIT 避免编译开销超过执行本身
+    DB_JIT: str = os.getenv("DB_JIT", "off")
+    DB_APPLICATION_NAME: str = os.getenv("DB_APPLICATION_NAME", "realtorai-api")
+    # 推荐排序查询单独的超时与 work_mem（为空则沿用服务端默认），避免慢排序占满连接池
+    DB_RANKING_TIMEOUT_SECONDS: float = float(os.getenv("DB_RANKING_TIMEOUT_SECONDS", "10"))
+    DB_RANKING_WORK_MEM: str = os.getenv("DB_RANKING_WORK_MEM", "")
+    # 流式导出每批查询的 id 数，决定单个请求的内存上限；连接只在查询单个批次时占用
+    DB_STREAM_BATCH_SIZE: int = int(os.getenv("DB_STREAM_BATCH_SIZE", "500"))
 
     @property
     def DATABASE_URL(self) -> str:
@@ -23,6 +54,86 @@ class Settings:
             f"@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    # 内存评分引擎：启动时把小区评分加载进内存，按周期刷新；关闭或未加载时回退到 SQL
+    SCORE_ENGINE_ENABLED: bool = _env_bool("SCORE_ENGINE_ENABLED", "true")
+    SCORE_ENGINE_REFRESH_SECONDS: int = int(
+        os.getenv("SCORE_ENGINE_REFRESH_SECONDS", "600")
+    )
+
+    # 地名抽取：精确匹配（含 data/location_alias.csv 别名）落空时，按编辑距离 1 做容错匹配
+    LOCATION_FUZZY_ENABLED: bool = _env_bool("LOCATION_FUZZY_ENABLED", "true")
+
+    # 管理接口（/api/admin/*）的访问令牌，请求需带 X-Admin-Token 头；为空时管理接口全部关闭
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+    # 地名 CSV 与 keyword_config.py 的变更检查间隔，检测到修改后自动热重载；0 表示不检查（仍可调用 /api/admin/reload）
+    DATA_RELOAD_WATCH_SECONDS: float = float(
+        os.getenv("DATA_RELOAD_WATCH_SECONDS", "0")
+    )
+
+    # 小区联想的内存索引：启动时从 v_community 构建，按周期刷新；未加载时回退到 SQL
+    SUGGEST_INDEX_ENABLED: bool = _env_bool("SUGGEST_INDEX_ENABLED", "true")
+    SUGGEST_INDEX_REFRESH_SECONDS: int = int(
+        os.getenv("SUGGEST_INDEX_REFRESH_SECONDS", "600")
+    )
+    # 为小区名/别名建立全拼与首字母前缀（需安装 pypinyin），支持输入 zhangjiang / zjgk
+    SUGGEST_PINYIN_ENABLED: bool = _env_bool("SUGGEST_PINYIN_ENABLED", "true")
+
+    # 带 seed 的推荐结果缓存
+    RECOMMEND_CACHE_TTL_SECONDS: int = int(
+        os.getenv("RECOMMEND_CACHE_TTL_SECONDS", "300")
+    )
+    RECOMMEND_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("RECOMMEND_CACHE_MAX_ENTRIES", "10000")
+    )
+
+    # 读多写少接口（市场概览、政策、评分查询）的结果缓存，底层数据至多每天更新
+    READ_CACHE_TTL_SECONDS: int = int(os.getenv("READ_CACHE_TTL_SECONDS", "600"))
+    READ_CACHE_MAX_ENTRIES: int = int(os.getenv("READ_CACHE_MAX_ENTRIES", "10000"))
+    READ_CACHE_MAX_BYTES: int = int(
+        os.getenv("READ_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+
+    # 市场统计数据文件变更检查间隔
+    MARKET_STATS_CHECK_INTERVAL_SECONDS: float = float(
+        os.getenv("MARKET_STATS_CHECK_INTERVAL_SECONDS", "5")
+    )
+
+    # 市场走势（联网 LLM）结果缓存：过期后后台刷新，最近一次结果落盘
+    MARKET_TREND_TTL_SECONDS: int = int(os.getenv("MARKET_TREND_TTL_SECONDS", "3600"))
+    MARKET_TREND_CACHE_PATH: str = os.getenv(
+        "MARKET_TREND_CACHE_PATH",
+        os.path.join(
+            os.path.dirname(__file__), "../../data/cache/market_trend.json"
+        ),
+    )
+
+    # LLM 解析/权重推理结果的本地持久化缓存（SQLite）
+    LLM_CACHE_ENABLED: bool = _env_bool("LLM_CACHE_ENABLED", "true")
+    LLM_CACHE_PATH: str = os.getenv(
+        "LLM_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "../../data/cache/llm_cache.sqlite3"),
+    )
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+    # jieba 词典缓存：把加入自定义词后的前缀词典序列化到文件，加快进程启动
+    JIEBA_DICT_CACHE: bool = _env_bool("JIEBA_DICT_CACHE", "true")
+    JIEBA_CACHE_PATH: str = os.getenv(
+        "JIEBA_CACHE_PATH",
+        os.path.join(os.path.dirname(__file__), "../../data/cache/jieba_dict.cache"),
+    )
+
+    # 本地 NLP（分词/解析/权重推理）的执行器：长文本放到线程池，短文本直接在事件循环内执行
+    NLP_EXECUTOR_WORKERS: int = int(os.getenv("NLP_EXECUTOR_WORKERS", "4"))
+    NLP_INLINE_MAX_CHARS: int = int(os.getenv("NLP_INLINE_MAX_CHARS", "200"))
+    # 大于 0 时改用多进程：每个进程各自加载 jieba 词典与 LocationMapper，解析吞吐随核数扩展；
+    # 进程模式下 NLP_INLINE_MAX_CHARS 不生效，短文本也交给工作进程
+    NLP_WORKER_PROCESSES: int = int(os.getenv("NLP_WORKER_PROCESSES", "0"))
+    NLP_WORKER_START_METHOD: str = os.getenv("NLP_WORKER_START_METHOD", "spawn")
+
+    # 接口直接用 orjson 序列化服务层结果，跳过 response_model 的二次校验（未安装 orjson 时退回标准库 json）
+    FAST_JSON_RESPONSE: bool = _env_bool("FAST_JSON_RESPONSE", "false")
+
     # 默认评分权重（可从 .env 或写死）
     DEFAULT_WEIGHTS: dict = {
         "base_score": 0.1,
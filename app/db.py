@@ -1,18 +1,49 @@
+import asyncio
+import time
 import asyncpg
-from typing import Optional, List, Dict, Any
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional, List, Dict, Any, Iterable, Sequence
 from app.core.config import settings
+from app.utils import metrics
 
 DATABASE_URL = settings.DATABASE_URL
 
+# 参与延迟分位数统计的最近获取连接次数
+ACQUIRE_SAMPLE_SIZE = 1024
+
 
 class Database:
     _pool: Optional[asyncpg.Pool] = None
 
+    # 固定文本的语句：name -> SQL。每个连接首次执行时由 asyncpg 的语句缓存 prepare，之后复用
+    _statements: Dict[str, str] = {}
+    _statement_stats: Dict[str, int] = {"executions": 0, "retries": 0}
+
+    # 连接池饱和度：等待获取连接的协程数、获取耗时（秒）、超时次数
+    _waiting = 0
+    _acquires = 0
+    _acquire_timeouts = 0
+    _acquire_samples: deque = deque(maxlen=ACQUIRE_SAMPLE_SIZE)
+
     @classmethod
     async def init_pool(cls):
         if cls._pool is None:
-            cls._pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=10)
-        print("✅ Database pool created.")
+            server_settings = {"application_name": settings.DB_APPLICATION_NAME}
+            if settings.DB_JIT:
+                server_settings["jit"] = settings.DB_JIT
+            cls._pool = await asyncpg.create_pool(
+                DATABASE_URL,
+                min_size=settings.DB_POOL_MIN_SIZE,
+                max_size=settings.DB_POOL_MAX_SIZE,
+                command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS,
+                max_inactive_connection_lifetime=settings.DB_MAX_INACTIVE_CONNECTION_LIFETIME,
+                server_settings=server_settings,
+            )
+        print(
+            f"✅ Database pool created "
+            f"(min={settings.DB_POOL_MIN_SIZE}, max={settings.DB_POOL_MAX_SIZE})."
+        )
 
     @classmethod
     async def close_pool(cls):
@@ -21,9 +52,152 @@ class Database:
             cls._pool = None
         print("🛑 Database pool closed.")
 
+    @classmethod
+    def register_statement(cls, name: str, query: str):
+        """注册一条固定文本的 SQL，供 fetch_prepared 按名称执行。"""
+        cls._statements[name] = query
+
+    @classmethod
+    @asynccontextmanager
+    async def acquire(cls, timeout: Optional[float] = None):
+        """从连接池获取连接，并记录等待数与获取耗时，用于观察连接池是否饱和。"""
+        cls._waiting += 1
+        start = time.perf_counter()
+        try:
+            conn = await cls._pool.acquire(
+                timeout=timeout or settings.DB_ACQUIRE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            cls._acquire_timeouts += 1
+            raise
+        finally:
+            cls._waiting -= 1
+        cls._acquires += 1
+        cls._acquire_samples.append(time.perf_counter() - start)
+        try:
+            yield conn
+        finally:
+            await cls._pool.release(conn)
+
     @classmethod
     async def fetch_all(
-        cls, query: str, params: Optional[List[Any]] = None
+        cls,
+        query: str,
+        params: Optional[List[Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> List[asyncpg.Record]:
+        async with cls.acquire() as conn:
+            return await conn.fetch(query, *(params or []), timeout=timeout)
+
+    @classmethod
+    async def fetch_one(
+        cls,
+        query: str,
+        params: Optional[List[Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[asyncpg.Record]:
+        async with cls.acquire() as conn:
+            return await conn.fetchrow(query, *(params or []), timeout=timeout)
+
+    @classmethod
+    async def fetch_val(
+        cls,
+        query: str,
+        params: Optional[List[Any]] = None,
+        column: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        async with cls.acquire() as conn:
+            return await conn.fetchval(
+                query, *(params or []), column=column, timeout=timeout
+            )
+
+    @classmethod
+    async def executemany(
+        cls,
+        query: str,
+        args: Iterable[Sequence[Any]],
+        timeout: Optional[float] = None,
+    ):
+        """批量执行同一条语句（在同一事务内），用于批量写入。"""
+        async with cls.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(query, args, timeout=timeout)
+
+    @classmethod
+    async def fetch_prepared(
+        cls,
+        name: str,
+        params: Optional[List[Any]] = None,
+        timeout: Optional[float] = None,
+        work_mem: Optional[str] = None,
     ) -> List[asyncpg.Record]:
-        async with cls._pool.acquire() as conn:
-            return await conn.fetch(query, *(params or []))
+        """
+        执行已注册的固定文本语句。文本不随参数变化，asyncpg 的连接级语句缓存在每个连接上
+        只 prepare 一次，之后跳过解析与规划；PreparedStatement 不跨 acquire 持有。
+        传入 work_mem 时在事务内用 set_config(..., true) 设置，只对本次查询生效。
+        """
+        query = cls._statements[name]
+        cls._statement_stats["executions"] += 1
+        async with cls.acquire() as conn:
+
+            async def run():
+                if not work_mem:
+                    return await conn.fetch(query, *(params or []), timeout=timeout)
+                async with conn.transaction():
+                    await conn.execute(
+                        "SELECT set_config('work_mem', $1, true)", work_mem
+                    )
+                    return await conn.fetch(query, *(params or []), timeout=timeout)
+
+            try:
+                return await run()
+            except (
+                asyncpg.exceptions.InvalidCachedStatementError,
+                asyncpg.exceptions.OutdatedSchemaCacheError,
+            ):
+                # 视图重建等导致缓存的语句失效（事务内 asyncpg 不会自动重试），asyncpg 已清掉
+                # 失效的缓存项，重新执行一次即会重新 prepare
+                cls._statement_stats["retries"] += 1
+                return await run()
+
+    @classmethod
+    async def health_check(cls) -> bool:
+        try:
+            return await cls.fetch_val("SELECT 1", timeout=2) == 1
+        except Exception:
+            return False
+
+    @classmethod
+    def statement_stats(cls) -> Dict[str, int]:
+        return {
+            **cls._statement_stats,
+            "registered": len(cls._statements),
+        }
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        samples = sorted(cls._acquire_samples)
+
+        def percentile_ms(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 3)
+
+        pool = cls._pool
+        return {
+            "size": pool.get_size() if pool else 0,
+            "idle": pool.get_idle_size() if pool else 0,
+            "min_size": settings.DB_POOL_MIN_SIZE,
+            "max_size": settings.DB_POOL_MAX_SIZE,
+            "waiting": cls._waiting,
+            "acquires": cls._acquires,
+            "acquire_timeouts": cls._acquire_timeouts,
+            "acquire_p50_ms": percentile_ms(0.5),
+            "acquire_p95_ms": percentile_ms(0.95),
+            "acquire_max_ms": round(samples[-1] * 1000, 3) if samples else None,
+        }
+
+
+metrics.register("prepared_statements", Database.statement_stats)
+metrics.register("database_pool", Database.pool_stats)
@@ -1,105 +1,214 @@
 # app/services/circle_recommender.py
 
-from typing import Dict, List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from app.db import Database
 from app.utils.sql_utils import format_sql
 from app.models.requirement import ParsedRequirement
 from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.services.circle_score_engine import circle_score_engine
+from app.services.community_score_engine import SCORE_KEYS
+from app.services.location_mapper import mapper
+from app.services.recommender import (
+    REGION_VARIANTS,
+    region_filter,
+    region_params,
+    region_variant,
+)
 
 MAX_INT = 2147483647
 
+# 参数位置固定：$1~$7 权重, $8 随机因子, $9 随机种子（可为 NULL）, $10 limit, $11/$12 价格区间，
+# 指定区域时从 $13 起为区域参数（见 recommender.region_params）
+_SELECT_SCORED = """
+SELECT v.circle_code, v.circle_name, v.district_name,
+       t.avg_list_price, t.avg_sign_price, t.transaction_count,
+       v.community_count,
+       v.avg_base_score, v.avg_living_score, v.avg_traffic_score,
+       v.avg_school_score, v.avg_hospital_score, v.avg_park_score,
+       v.avg_restaurant_score,
+       (
+           ROUND(
+               v.avg_base_score * CAST($1 AS NUMERIC) +
+               v.avg_living_score * CAST($2 AS NUMERIC) +
+               v.avg_traffic_score * CAST($3 AS NUMERIC) +
+               v.avg_school_score * CAST($4 AS NUMERIC) +
+               v.avg_hospital_score * CAST($5 AS NUMERIC) +
+               v.avg_park_score * CAST($6 AS NUMERIC) +
+               v.avg_restaurant_score * CAST($7 AS NUMERIC)
+           , 2)
+           + (
+               CASE WHEN $9::text IS NULL THEN RANDOM()
+                    ELSE ('x' || substr(md5($9 || ':' || v.circle_code::text), 1, 8))::bit(32)::bigint
+                         / 4294967295.0
+               END * CAST($8 AS DOUBLE PRECISION)
+           )
+       ) AS final_score
+FROM public.v_circle_scores v
+JOIN public.latest_circle_transactions t ON v.circle_code = t.circle_code
+WHERE t.avg_list_price BETWEEN $11 AND $12"""
+_ORDER_LIMIT = """
+ORDER BY final_score DESC
+LIMIT $10
+"""
+
+# 区域形态 -> (语句名, SQL)，每种区域形态各用一条固定语句
+_STATEMENTS = {
+    variant: (
+        "recommend_circles" + ("" if variant == "all" else f"_in_{variant}"),
+        _SELECT_SCORED + region_filter(variant, 13) + _ORDER_LIMIT,
+    )
+    for variant in REGION_VARIANTS
+}
+for _name, _sql in _STATEMENTS.values():
+    Database.register_statement(_name, _sql)
+
+# 带 seed 的请求结果可复现，按规范化后的查询条件缓存
+_result_cache = TTLCache(
+    settings.RECOMMEND_CACHE_TTL_SECONDS,
+    settings.RECOMMEND_CACHE_MAX_ENTRIES,
+    name="recommend_circles",
+)
+
+
+def _filter_args(requirement: ParsedRequirement) -> tuple:
+    """把结构化需求转换为 (region, min_price, max_price)。"""
+    budget_range = requirement.budget or [None, None]
+    min_price = (budget_range[0] or 0) * 10000
+    max_price = budget_range[1] * 10000 if budget_range[1] else MAX_INT
+    return (
+        mapper.resolve_region(requirement.district_codes, requirement.circle_codes),
+        min_price,
+        max_price,
+    )
+
+
+def _build_query(
+    requirement: ParsedRequirement,
+    weights: Optional[Dict[str, float]] = None,
+    limit: int = 10,
+    random_factor: float = 1.0,
+    seed: Optional[str] = None,
+) -> tuple:
+    """
+    规范化为排序查询元组：
+    (region, min_price, max_price, weights, limit, random_factor, seed)
+    region 为归一化后的 (板块编码, 区编码) 元组，None 表示不限区域。
+    """
+    if not requirement:
+        raise ValueError("Requirement must be provided")
+    return (
+        *_filter_args(requirement),
+        weights or settings.DEFAULT_WEIGHTS,
+        limit,
+        random_factor,
+        seed,
+    )
+
+
+def _cache_key(query: tuple) -> Optional[tuple]:
+    region, lo, hi, weights, limit, random_factor, seed = query
+    if seed is None:
+        return None
+    return (
+        region,
+        lo,
+        hi,
+        tuple(weights[k] for k in SCORE_KEYS),
+        limit,
+        random_factor,
+        seed,
+    )
+
 
 class CircleRecommenderService:
     def __init__(self):
         self.db = Database
 
+    async def recommend_circles_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> List[List[Dict]]:
+        """批量推荐板块，items 中每一项为 recommend_circles 的关键字参数。"""
+        queries = [_build_query(**item) for item in items]
+        keys = [_cache_key(q) for q in queries]
+        results: List[Optional[List[Dict]]] = [
+            _result_cache.get(k) if k is not None else None for k in keys
+        ]
+        pending = [i for i, r in enumerate(results) if r is None]
+
+        if circle_score_engine.ready:
+            ranked = await asyncio.to_thread(
+                circle_score_engine.recommend_batch, [queries[i] for i in pending]
+            )
+        else:
+            ranked = [await self._recommend_sql(queries[i]) for i in pending]
+
+        for i, rows in zip(pending, ranked):
+            results[i] = rows
+            if keys[i] is not None:
+                _result_cache.set(keys[i], rows)
+        return results
+
     async def recommend_circles(
         self,
         requirement: ParsedRequirement,
         weights: Optional[Dict[str, float]] = None,
         limit: int = 10,
         random_factor: float = 1.0,
+        seed: Optional[str] = None,
     ) -> List[Dict]:
-        if not requirement:
-            raise ValueError("Requirement must be provided")
-        score_weights = weights or settings.DEFAULT_WEIGHTS
-
-        district_codes = requirement.district_codes or []
-        circle_codes = requirement.circle_codes or []
-        budget_range = requirement.budget or [None, None]
-
-        min_price = (budget_range[0] or 0) * 10000
-        max_price = budget_range[1] * 10000 if budget_range[1] else MAX_INT
-        # 动态拼接 WHERE 条件
-        where_clauses = []
-        params = []
-        param_idx = 1
-
-        if district_codes:
-            where_clauses.append(f"v.district_code = ANY(${param_idx})")
-            params.append(district_codes)
-            param_idx += 1
-        if circle_codes:
-            where_clauses.append(f"v.circle_code = ANY(${param_idx})")
-            params.append(circle_codes)
-            param_idx += 1
-
-        if not where_clauses:
-            where_sql = "TRUE"
+        query = _build_query(requirement, weights, limit, random_factor, seed)
+        key = _cache_key(query)
+        if key is not None:
+            cached = _result_cache.get(key)
+            if cached is not None:
+                return cached
+
+        # 内存评分引擎已加载时直接在进程内排序，否则回退到 SQL
+        if circle_score_engine.ready:
+            ranked = await asyncio.to_thread(circle_score_engine.recommend_batch, [query])
+            rows = ranked[0]
         else:
-            where_sql = " OR ".join(where_clauses)
-
-        # 记录 limit 参数的位置
-        limit_idx = param_idx
-        params.append(limit)
-        param_idx += 1
-
-        # 加入权重参数
-        params += [
-            score_weights["base_score"],
-            score_weights["living_score"],
-            score_weights["traffic_score"],
-            score_weights["school_score"],
-            score_weights["hospital_score"],
-            score_weights["park_score"],
-            score_weights["restaurant_score"],
+            rows = await self._recommend_sql(query)
+
+        if key is not None:
+            _result_cache.set(key, rows)
+        return rows
+
+    async def _recommend_sql(self, query: tuple) -> List[Dict]:
+        (
+            region,
+            min_price,
+            max_price,
+            score_weights,
+            limit,
+            random_factor,
+            seed,
+        ) = query
+
+        # 固定文本的语句：按区域形态选用各自的语句，随机因子和种子作为绑定参数
+        params = [
+            *(score_weights[k] for k in SCORE_KEYS),
+            random_factor,
+            seed,
+            limit,
+            min_price,
+            max_price,
+            *region_params(region),
         ]
-
-        # 加入预算参数
-        params += [min_price, max_price]
-
-        query = f"""
-        SELECT v.circle_code, v.circle_name, v.district_name,
-               t.avg_list_price, t.avg_sign_price, t.transaction_count,
-               v.community_count,
-               v.avg_base_score, v.avg_living_score, v.avg_traffic_score,
-               v.avg_school_score, v.avg_hospital_score, v.avg_park_score,
-               v.avg_restaurant_score,
-               (
-                   ROUND(
-                       v.avg_base_score * CAST(${param_idx} AS NUMERIC) +
-                       v.avg_living_score * CAST(${param_idx+1} AS NUMERIC) +
-                       v.avg_traffic_score * CAST(${param_idx+2} AS NUMERIC) +
-                       v.avg_school_score * CAST(${param_idx+3} AS NUMERIC) +
-                       v.avg_hospital_score * CAST(${param_idx+4} AS NUMERIC) +
-                       v.avg_park_score * CAST(${param_idx+5} AS NUMERIC) +
-                       v.avg_restaurant_score * CAST(${param_idx+6} AS NUMERIC)
-                   , 2)
-                   + (RANDOM() * {random_factor})
-               ) AS final_score
-        FROM public.v_circle_scores v
-        JOIN public.latest_circle_transactions t ON v.circle_code = t.circle_code
-        WHERE {where_sql}
-          AND t.avg_list_price BETWEEN ${param_idx+7} AND ${param_idx+8}
-        ORDER BY final_score DESC
-        LIMIT ${limit_idx}
-        """
+        name, sql = _STATEMENTS[region_variant(region)]
 
         print("🌐", "-" * 80)
-        print(format_sql(query, params))
+        print(format_sql(sql, params))
         print("🌐", "-" * 80)
 
-        rows = await self.db.fetch_all(query, params)
+        rows = await self.db.fetch_prepared(
+            name,
+            params,
+            timeout=settings.DB_RANKING_TIMEOUT_SECONDS,
+            work_mem=settings.DB_RANKING_WORK_MEM or None,
+        )
         return [dict(row) for row in rows]
 
 
@@ -0,0 +1,137 @@
+# app/services/circle_score_engine.py
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.db import Database
+from app.services.community_score_engine import (
+    SCORE_KEYS,
+    SeededJitter,
+    rank_in_chunks,
+)
+from app.services.location_mapper import mapper
+
+# 板块评分列名为 avg_ 前缀，与 SCORE_KEYS 一一对应
+CIRCLE_SCORE_COLUMNS = tuple(f"avg_{k}" for k in SCORE_KEYS)
+
+RESULT_KEYS = (
+    "circle_code",
+    "circle_name",
+    "district_name",
+    "avg_list_price",
+    "avg_sign_price",
+    "transaction_count",
+    "community_count",
+)
+
+SQL_CIRCLES = f"""
+SELECT v.circle_code, v.circle_name, v.district_code, v.district_name,
+       t.avg_list_price, t.avg_sign_price, t.transaction_count,
+       v.community_count, {", ".join(f"v.{k}" for k in CIRCLE_SCORE_COLUMNS)}
+FROM public.v_circle_scores v
+JOIN public.latest_circle_transactions t ON v.circle_code = t.circle_code
+"""
+
+
+class _Snapshot:
+    """板块评分快照，刷新时整体替换。"""
+
+    def __init__(self, rows):
+        n = len(rows)
+        self.rows: List[Dict[str, Any]] = [
+            {k: row[k] for k in RESULT_KEYS + CIRCLE_SCORE_COLUMNS} for row in rows
+        ]
+        self.scores = np.array(
+            [[row[k] for k in CIRCLE_SCORE_COLUMNS] for row in rows], dtype=np.float64
+        ).reshape(n, len(CIRCLE_SCORE_COLUMNS))
+        self.circle_row: Dict[str, int] = {row["circle_code"]: i for i, row in enumerate(rows)}
+        # 区 -> 板块编码，用于匹配 circle.csv 未收录的板块（按板块自身的区编码回退）
+        self.district_circles: Dict[Any, List[str]] = {}
+        for row in rows:
+            self.district_circles.setdefault(row["district_code"], []).append(row["circle_code"])
+        self.jitter = SeededJitter([row["circle_code"] for row in rows])
+        self.list_price = np.array([row["avg_list_price"] for row in rows], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class CircleScoreEngine:
+    """板块加权评分的进程内实现，与 CommunityScoreEngine 对应。板块数量很少，整表常驻内存。"""
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._rng = np.random.default_rng()
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    async def load(self):
+        rows = await Database.fetch_all(SQL_CIRCLES)
+        snapshot = await asyncio.to_thread(_Snapshot, rows)
+        self._snapshot = snapshot
+        print(f"✅ Circle score engine loaded ({len(snapshot)} circles).")
+
+    @staticmethod
+    def _candidate_rows(
+        snap: _Snapshot,
+        region: Optional[tuple],
+        min_price: float,
+        max_price: float,
+    ) -> np.ndarray:
+        if region is None:
+            rows = np.arange(len(snap))
+        else:
+            circles, districts = region
+            codes = set(circles)
+            for district in districts:
+                codes.update(
+                    c
+                    for c in snap.district_circles.get(district, ())
+                    if mapper.get_circle_district(c) is None
+                )
+            rows = np.array(
+                sorted(snap.circle_row[c] for c in codes if c in snap.circle_row),
+                dtype=np.intp,
+            )
+        price = snap.list_price[rows]
+        return rows[(price >= min_price) & (price <= max_price)]
+
+    def recommend_batch(self, queries: List[tuple]) -> List[List[Dict]]:
+        """
+        批量推荐。queries 中每一项为
+        (region, min_price, max_price, weights, limit, random_factor, seed)，
+        region 为归一化后的 (板块编码, 区编码) 元组（None 表示不限区域）。
+        纯 CPU 计算，调用方应在线程中执行。
+        """
+        snap = self._snapshot
+        if snap is None:
+            raise RuntimeError("Circle score engine is not loaded")
+
+        groups: Dict[tuple, List[int]] = {}
+        for i, (region, lo, hi, *_rest) in enumerate(queries):
+            groups.setdefault((region, lo, hi), []).append(i)
+
+        results: List[List[Dict]] = [[] for _ in queries]
+        for (region, lo, hi), members in groups.items():
+            candidates = self._candidate_rows(snap, region, lo, hi)
+            ranked = rank_in_chunks(
+                snap.scores[candidates],
+                snap.jitter,
+                candidates,
+                [queries[i][3:7] for i in members],
+                self._rng,
+            )
+            for i, (top, final) in zip(members, ranked):
+                results[i] = [
+                    {**snap.rows[candidates[j]], "final_score": float(final[j])}
+                    for j in top
+                ]
+        return results
+
+
+# 单例
+circle_score_engine = CircleScoreEngine()
@@ -1,5 +1,56 @@
 from typing import List, Dict
 from app.db import Database
+from app.core.config import settings
+from app.utils.cache import AsyncCache
+
+# 按请求的 id 列表缓存合并后的结果
+_cache = AsyncCache(
+    settings.READ_CACHE_TTL_SECONDS,
+    max_entries=settings.READ_CACHE_MAX_ENTRIES,
+    max_bytes=settings.READ_CACHE_MAX_BYTES,
+    name="circle_scores",
+)
+
+SCORE_COLUMNS = (
+    "district_code",
+    "district_name",
+    "circle_code",
+    "circle_name",
+    "community_count",
+) + tuple(
+    f"avg_{k}_score{suffix}"
+    for k in ("base", "living", "traffic", "school", "hospital", "park", "restaurant")
+    for suffix in ("", "_rank", "_percentile")
+)
+PRICE_COLUMNS = (
+    "circle_code",
+    "latest_month",
+    "latest_avg_price",
+    "prev_avg_price",
+    "mom_ratio",
+)
+
+# 评分排名与均价环比一次查询完成，unnest ... WITH ORDINALITY 保留请求顺序；
+# circle_code 取请求值，两侧都有该列时不会冲突
+SQL_CIRCLE_SCORES = f"""
+SELECT q.circle_code,
+       {", ".join(f"s.{k}" for k in SCORE_COLUMNS if k != "circle_code")},
+       {", ".join(f"p.{k}" for k in PRICE_COLUMNS if k != "circle_code")},
+       s.circle_code IS NOT NULL AS has_score,
+       p.circle_code IS NOT NULL AS has_price
+FROM unnest($1::text[]) WITH ORDINALITY AS q(circle_code, ord)
+LEFT JOIN public.circle_score_rankings s ON s.circle_code = q.circle_code
+LEFT JOIN public.v_circle_avg_price_monthly_ratio p ON p.circle_code = q.circle_code
+ORDER BY q.ord
+"""
+
+
+def merge_row(row) -> Dict:
+    """只包含实际存在的一侧字段，与原先 {**score, **price} 一致。"""
+    keys = (SCORE_COLUMNS if row["has_score"] else ()) + (
+        PRICE_COLUMNS if row["has_price"] else ()
+    )
+    return {k: row[k] for k in keys}
 
 
 class CircleScoreService:
@@ -9,37 +60,10 @@ class CircleScoreService:
     async def get_circles_scores(self, circle_codes: List[str]) -> List[Dict]:
         if not circle_codes:
             return []
+        return await _cache.get_or_load(
+            tuple(circle_codes), lambda: self._fetch_circles_scores(circle_codes)
+        )
 
-        # 查询评分及排名
-        sql_score = """
-        SELECT district_code, district_name, circle_code, circle_name, community_count,
-               avg_base_score, avg_base_score_rank, avg_base_score_percentile,
-               avg_living_score, avg_living_score_rank, avg_living_score_percentile,
-               avg_traffic_score, avg_traffic_score_rank, avg_traffic_score_percentile,
-               avg_school_score, avg_school_score_rank, avg_school_score_percentile,
-               avg_hospital_score, avg_hospital_score_rank, avg_hospital_score_percentile,
-               avg_park_score, avg_park_score_rank, avg_park_score_percentile,
-               avg_restaurant_score, avg_restaurant_score_rank, avg_restaurant_score_percentile
-        FROM public.circle_score_rankings
-        WHERE circle_code = ANY($1)
-        """
-        score_rows = await self.db.fetch_all(sql_score, [circle_codes])
-        score_map = {row["circle_code"]: dict(row) for row in score_rows}
-
-        # 查询最新均价及环比
-        sql_price = """
-        SELECT circle_code, latest_month, latest_avg_price, prev_avg_price, mom_ratio
-        FROM public.v_circle_avg_price_monthly_ratio
-        WHERE circle_code = ANY($1)
-        """
-        price_rows = await self.db.fetch_all(sql_price, [circle_codes])
-        price_map = {row["circle_code"]: dict(row) for row in price_rows}
-
-        # 合并数据
-        result = []
-        for code in circle_codes:
-            score = score_map.get(code, {})
-            price = price_map.get(code, {})
-            merged = {**score, **price}
-            result.append(merged)
-        return result
+    async def _fetch_circles_scores(self, circle_codes: List[str]) -> List[Dict]:
+        rows = await self.db.fetch_all(SQL_CIRCLE_SCORES, [circle_codes])
+        return [merge_row(row) for row in rows]
@@ -0,0 +1,334 @@
+# app/services/community_score_engine.py
+
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from app.db import Database
+from app.services.location_mapper import mapper
+
+SCORE_KEYS = (
+    "base_score",
+    "living_score",
+    "traffic_score",
+    "school_score",
+    "hospital_score",
+    "park_score",
+    "restaurant_score",
+)
+
+# 批量打分时每次矩阵乘法处理的请求数（列数）
+RANK_CHUNK_SIZE = 64
+
+# 推荐结果中返回的非评分字段（与 SQL 路径保持一致）
+RESULT_KEYS = ("id", "name", "district_name", "circle_name", "avg_listing_price")
+
+SQL_COMMUNITIES = f"""
+SELECT v.id, v.name, v.district_code, v.district_name, v.circle_code, v.circle_name,
+       v.avg_listing_price, {", ".join(f"v.{k}" for k in SCORE_KEYS)}
+FROM public.v_community_scores v
+"""
+
+SQL_PRICE_RANGE = """
+SELECT community_id, min_avg_price, max_avg_price
+FROM public.v_community_price_range
+"""
+
+SQL_ROOMTYPE_PRICE = """
+SELECT community_id, room_type, avg_price
+FROM public.mv_community_roomtype_avg_price
+"""
+
+
+class _Snapshot:
+    """一次加载得到的只读数据快照，刷新时整体替换，读者无需加锁。"""
+
+    def __init__(self, rows, price_ranges, roomtype_prices):
+        n = len(rows)
+        self.rows: List[Dict[str, Any]] = [
+            {k: row[k] for k in RESULT_KEYS + SCORE_KEYS} for row in rows
+        ]
+        id_to_idx = {row["id"]: i for i, row in enumerate(rows)}
+        self.jitter = SeededJitter([row["id"] for row in rows])
+
+        # n x 7 评分矩阵，NULL 评分记为 NaN
+        self.scores = np.array(
+            [[row[k] for k in SCORE_KEYS] for row in rows], dtype=np.float64
+        ).reshape(n, len(SCORE_KEYS))
+
+        # 按板块分桶的行下标（升序），区域过滤只需拼接相关板块的桶；
+        # 另按 区 -> 板块 分桶，用于匹配 circle.csv 未收录的板块（按小区自身的区编码回退）
+        buckets: Dict[str, List[int]] = {}
+        district_buckets: Dict[Any, Dict[Any, List[int]]] = {}
+        for i, row in enumerate(rows):
+            buckets.setdefault(row["circle_code"], []).append(i)
+            district_buckets.setdefault(row["district_code"], {}).setdefault(
+                row["circle_code"], []
+            ).append(i)
+        self.circle_rows: Dict[str, np.ndarray] = {
+            code: np.array(idx, dtype=np.intp) for code, idx in buckets.items()
+        }
+        self.district_circle_rows: Dict[Any, Dict[Any, np.ndarray]] = {
+            district: {code: np.array(idx, dtype=np.intp) for code, idx in circles.items()}
+            for district, circles in district_buckets.items()
+        }
+
+        # 小区整体价格区间（v_community_price_range）
+        self.min_price = np.full(n, np.nan)
+        self.max_price = np.full(n, np.nan)
+        for r in price_ranges:
+            i = id_to_idx.get(r["community_id"])
+            if i is None:
+                continue
+            self.min_price[i] = np.nan if r["min_avg_price"] is None else r["min_avg_price"]
+            self.max_price[i] = np.nan if r["max_avg_price"] is None else r["max_avg_price"]
+
+        # 分房型均价（mv_community_roomtype_avg_price），每个房型一列
+        room_types = sorted({r["room_type"] for r in roomtype_prices if r["room_type"] is not None})
+        self.room_type_col: Dict[Any, int] = {rt: c for c, rt in enumerate(room_types)}
+        self.room_prices = np.full((n, len(room_types)), np.nan)
+        for r in roomtype_prices:
+            i = id_to_idx.get(r["community_id"])
+            c = self.room_type_col.get(r["room_type"])
+            if i is None or c is None or r["avg_price"] is None:
+                continue
+            self.room_prices[i, c] = r["avg_price"]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class CommunityScoreEngine:
+    """
+    进程内的小区加权评分引擎：
+    把 v_community_scores 的七项评分、按板块分桶的行下标以及价格区间常驻内存，
+    用 NumPy 完成过滤 + 加权点积 + top-k，替代每次请求在数据库上的视图扫描排序。
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+        self._rng = np.random.default_rng()
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    async def load(self):
+        rows = await Database.fetch_all(SQL_COMMUNITIES)
+        price_ranges = await Database.fetch_all(SQL_PRICE_RANGE)
+        roomtype_prices = await Database.fetch_all(SQL_ROOMTYPE_PRICE)
+        snapshot = await asyncio.to_thread(
+            _Snapshot, rows, price_ranges, roomtype_prices
+        )
+        self._snapshot = snapshot
+        print(f"✅ Community score engine loaded ({len(snapshot)} communities).")
+
+    @staticmethod
+    def _candidate_rows(
+        snap: _Snapshot,
+        region: Optional[tuple],
+        bedroom_count: Optional[int],
+        min_price: float,
+        max_price: float,
+    ) -> np.ndarray:
+        # 区域过滤：region 为 None 时不过滤，否则只取相关板块的桶；
+        # 指定了区时，该区下 circle.csv 未收录的板块按区编码回退匹配（与 SQL 的 "districts" 形态一致）。
+        # 去重排序后保持与全表扫描一致的行顺序
+        if region is None:
+            rows = np.arange(len(snap))
+        else:
+            circles, districts = region
+            buckets = [snap.circle_rows[c] for c in circles if c in snap.circle_rows]
+            for district in districts:
+                for code, idx in snap.district_circle_rows.get(district, {}).items():
+                    if mapper.get_circle_district(code) is None:
+                        buckets.append(idx)
+            if not buckets:
+                return np.empty(0, dtype=np.intp)
+            rows = np.unique(np.concatenate(buckets))
+
+        # 价格过滤，只在候选子集上计算
+        if bedroom_count is not None:
+            col = snap.room_type_col.get(bedroom_count)
+            if col is None:
+                return rows[:0]
+            price = snap.room_prices[rows, col]
+            keep = (price >= min_price) & (price <= max_price)
+        else:
+            lo, hi = snap.min_price[rows], snap.max_price[rows]
+            keep = (
+                np.isfinite(lo)
+                & np.isfinite(hi)
+                & ~((hi < min_price) | (lo > max_price))
+            )
+        return rows[keep]
+
+    def recommend_batch(self, queries: List[tuple]) -> List[List[Dict]]:
+        """
+        批量推荐。queries 中每一项为
+        (region, bedroom_count, min_price, max_price, weights, limit, random_factor, seed)，
+        region 为归一化后的 (板块编码, 区编码) 元组（None 表示不限区域）。
+        过滤条件相同的请求合并为一组，组内按 RANK_CHUNK_SIZE 列分块做 (候选数 x 7) @ (7 x m) 矩阵乘法。
+        纯 CPU 计算，调用方应在线程中执行（快照只读，可并发读取）。
+        """
+        snap = self._snapshot
+        if snap is None:
+            raise RuntimeError("Community score engine is not loaded")
+
+        groups: Dict[tuple, List[int]] = {}
+        for i, (region, bedroom, lo, hi, *_rest) in enumerate(queries):
+            groups.setdefault((region, bedroom, lo, hi), []).append(i)
+
+        results: List[List[Dict]] = [[] for _ in queries]
+        for (region, bedroom, lo, hi), members in groups.items():
+            candidates = self._candidate_rows(snap, region, bedroom, lo, hi)
+            ranked = rank_in_chunks(
+                snap.scores[candidates],
+                snap.jitter,
+                candidates,
+                [queries[i][4:8] for i in members],
+                self._rng,
+            )
+            for i, (top, final) in zip(members, ranked):
+                results[i] = [
+                    {**snap.rows[candidates[j]], "final_score": float(final[j])}
+                    for j in top
+                ]
+        return results
+
+
+def weight_matrix(weights: List[Dict[str, float]]) -> np.ndarray:
+    """把 m 组权重字典转换为 m x 7 矩阵，列顺序与 SCORE_KEYS 一致。"""
+    return np.array(
+        [[w[k] for k in SCORE_KEYS] for w in weights], dtype=np.float64
+    ).reshape(len(weights), len(SCORE_KEYS))
+
+
+def top_k(final: np.ndarray, k: int) -> np.ndarray:
+    """返回 final 中最大的 k 个下标（降序），NaN 不参与排序。"""
+    valid = np.flatnonzero(np.isfinite(final))
+    k = min(k, len(valid))
+    if k <= 0:
+        return valid[:0]
+    values = final[valid]
+    top = np.argpartition(-values, k - 1)[:k] if k < len(valid) else np.arange(k)
+    return valid[top[np.argsort(-values[top], kind="stable")]]
+
+
+def rank_batch(
+    scores: np.ndarray,
+    weights: List[Dict[str, float]],
+    limits: List[int],
+    random_factors: List[float],
+    noise: np.ndarray,
+) -> List[tuple]:
+    """
+    对同一批候选（scores: n x 7）按 m 组权重打分并各自取 top-k。
+    noise 为 n x m 的 [0, 1) 扰动矩阵，乘以各请求的 random_factor 后叠加到得分上。
+    返回 m 个 (top 下标, final_score 向量)。
+    """
+    w = weight_matrix(weights)
+    final = np.round(scores @ w.T, 2)
+    # 随机因子，最大扰动由各请求的参数控制
+    final += noise * np.asarray(random_factors, dtype=np.float64)
+    return [
+        (top_k(final[:, j], limit), final[:, j]) for j, limit in enumerate(limits)
+    ]
+
+
+def rank_in_chunks(
+    scores: np.ndarray,
+    jitter: "SeededJitter",
+    candidates: np.ndarray,
+    params: List[tuple],
+    rng: np.random.Generator,
+) -> Iterator[tuple]:
+    """
+    按 RANK_CHUNK_SIZE 个请求一块调用 rank_batch，params 中每项为 (weights, limit, random_factor, seed)。
+    扰动与得分矩阵的大小限制在 候选数 x RANK_CHUNK_SIZE，大批量请求的峰值内存不随批量增长。
+    依次产出每个请求的 (top 下标, final_score 向量)。
+    """
+    for start in range(0, len(params), RANK_CHUNK_SIZE):
+        chunk = params[start : start + RANK_CHUNK_SIZE]
+        yield from rank_batch(
+            scores,
+            [p[0] for p in chunk],
+            [p[1] for p in chunk],
+            [p[2] for p in chunk],
+            batch_noise(jitter, candidates, [p[3] for p in chunk], rng),
+        )
+
+
+def seeded_jitter(seed: str, ids: List[str]) -> np.ndarray:
+    """
+    由 (seed, id) 决定的 [0, 1] 伪随机数，与 SQL 中
+    ('x' || substr(md5(seed || ':' || id), 1, 8))::bit(32)::bigint / 4294967295.0 一致。
+    """
+    return _jitter_values(
+        hashlib.md5(f"{seed}:".encode("utf-8")), [str(i).encode("utf-8") for i in ids]
+    )
+
+
+def _jitter_values(prefix, suffixes: List[bytes]) -> np.ndarray:
+    """prefix 为已喂入 "seed:" 的 md5 对象，逐个 copy 后追加 id，省去重复哈希公共前缀。"""
+    values = np.empty(len(suffixes), dtype=np.float64)
+    for k, suffix in enumerate(suffixes):
+        h = prefix.copy()
+        h.update(suffix)
+        # md5 十六进制的前 8 位即摘要的前 4 个字节（大端）
+        values[k] = int.from_bytes(h.digest()[:4], "big")
+    return values / 0xFFFFFFFF
+
+
+class SeededJitter:
+    """
+    按 seed 计算扰动：只对本次的候选行做 md5，过滤后只剩少量候选时开销很小；
+    候选覆盖大半个表时算出整列并按 seed 缓存，供同一 seed 的后续请求复用。
+    推荐在线程中执行，缓存读写加锁。
+    """
+
+    def __init__(self, ids: List[str], max_seeds: int = 32):
+        self.ids = ids
+        self._suffixes = [str(i).encode("utf-8") for i in ids]
+        self.max_seeds = max_seeds
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, seed: str, rows: np.ndarray) -> np.ndarray:
+        """返回 rows 各行在该 seed 下的扰动值。"""
+        with self._lock:
+            values = self._cache.get(seed)
+            if values is not None:
+                self._cache.move_to_end(seed)
+                return values[rows]
+        prefix = hashlib.md5(f"{seed}:".encode("utf-8"))
+        if len(rows) * 2 < len(self._suffixes):
+            return _jitter_values(prefix, [self._suffixes[r] for r in rows])
+        values = _jitter_values(prefix, self._suffixes)
+        with self._lock:
+            self._cache[seed] = values
+            while len(self._cache) > self.max_seeds:
+                self._cache.popitem(last=False)
+        return values[rows]
+
+
+def batch_noise(
+    jitter: SeededJitter,
+    candidates: np.ndarray,
+    seeds: List[Optional[str]],
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """为一组请求生成 n x m 扰动矩阵：带 seed 的列可复现，不带 seed 的列为随机数。"""
+    noise = rng.random((len(candidates), len(seeds)))
+    for j, seed in enumerate(seeds):
+        if seed is not None:
+            noise[:, j] = jitter(seed, candidates)
+    return noise
+
+
+# 单例
+community_score_engine = CommunityScoreEngine()
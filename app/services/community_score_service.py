@@ -1,5 +1,67 @@
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict
 from app.db import Database
+from app.core.config import settings
+from app.utils.cache import AsyncCache
+
+# 按请求的 id 列表缓存合并后的结果
+_cache = AsyncCache(
+    settings.READ_CACHE_TTL_SECONDS,
+    max_entries=settings.READ_CACHE_MAX_ENTRIES,
+    max_bytes=settings.READ_CACHE_MAX_BYTES,
+    name="community_scores",
+)
+
+COMMUNITY_COLUMNS = tuple(
+    """
+    id name alias city_code district_code district_name circle_code circle_name
+    circle_line completion_years building_types transaction_rights floor_totals
+    house_types developer building_count household_count head_image bk_id grade
+    created_at updated_at
+    """.split()
+)
+RANKING_COLUMNS = tuple(
+    """
+    ring year_range base_score living_score traffic_score school_score
+    hospital_score park_score restaurant_score avg_listing_price base_rank
+    base_exceed_pct living_rank living_exceed_pct traffic_rank
+    traffic_exceed_pct school_rank school_exceed_pct hospital_rank
+    hospital_exceed_pct park_rank park_exceed_pct restaurant_rank
+    restaurant_exceed_pct
+    """.split()
+)
+SCORE_COLUMNS = COMMUNITY_COLUMNS + RANKING_COLUMNS
+PRICE_COLUMNS = (
+    "community_id",
+    "latest_month",
+    "latest_avg_price",
+    "prev_avg_price",
+    "mom_ratio",
+)
+
+# 评分与价格环比一次查询完成：unnest ... WITH ORDINALITY 保留请求顺序（含重复 id），
+# 两侧都 LEFT JOIN，缺失的一侧通过 has_score / has_price 标记
+SQL_COMMUNITY_SCORES = f"""
+SELECT {", ".join(f"c.{k}" for k in COMMUNITY_COLUMNS)},
+       {", ".join(f"r.{k}" for k in RANKING_COLUMNS)},
+       {", ".join(f"p.{k}" for k in PRICE_COLUMNS)},
+       r.id IS NOT NULL AS has_score,
+       p.community_id IS NOT NULL AS has_price
+FROM unnest($1::text[]) WITH ORDINALITY AS q(id, ord)
+LEFT JOIN (
+    public.v_community c
+    JOIN public.community_scores_ranking r ON c.id = r.id
+) ON c.id = q.id
+LEFT JOIN public.v_community_listing_price_mom p ON p.community_id = q.id
+ORDER BY q.ord
+"""
+
+
+def merge_row(row) -> Dict:
+    """把一行联合查询结果转成接口字段：只包含实际存在的一侧，与原先 {**score, **price} 一致。"""
+    keys = (SCORE_COLUMNS if row["has_score"] else ()) + (
+        PRICE_COLUMNS if row["has_price"] else ()
+    )
+    return {k: row[k] for k in keys}
 
 
 class CommunityScoreService:
@@ -9,80 +71,25 @@ class CommunityScoreService:
     async def get_communities_scores(self, community_ids: List[str]) -> List[Dict]:
         if not community_ids:
             return []
-        # 查询评分信息
-        sql_score = """
-        SELECT 
-            c.id, 
-            c.name, 
-            c.alias, 
-            c.city_code, 
-            c.district_code, 
-            c.district_name, 
-            c.circle_code, 
-            c.circle_name, 
-            c.circle_line, 
-            c.completion_years, 
-            c.building_types, 
-            c.transaction_rights, 
-            c.floor_totals, 
-            c.house_types, 
-            c.developer, 
-            c.building_count, 
-            c.household_count, 
-            c.head_image, 
-            c.bk_id, 
-            c.grade, 
-            c.created_at, 
-            c.updated_at,
-            r.ring, 
-            r.year_range, 
-            r.base_score, 
-            r.living_score, 
-            r.traffic_score, 
-            r.school_score, 
-            r.hospital_score, 
-            r.park_score, 
-            r.restaurant_score, 
-            r.avg_listing_price, 
-            r.base_rank, 
-            r.base_exceed_pct, 
-            r.living_rank, 
-            r.living_exceed_pct, 
-            r.traffic_rank, 
-            r.traffic_exceed_pct, 
-            r.school_rank, 
-            r.school_exceed_pct, 
-            r.hospital_rank, 
-            r.hospital_exceed_pct, 
-            r.park_rank, 
-            r.park_exceed_pct, 
-            r.restaurant_rank, 
-            r.restaurant_exceed_pct
-        FROM 
-            public.v_community c
-        JOIN 
-            public.community_scores_ranking r
-        ON 
-            c.id = r.id
-        WHERE c.id = ANY($1)
-        """
-        score_rows = await self.db.fetch_all(sql_score, [community_ids])
-        score_map = {row["id"]: dict(row) for row in score_rows}
+        return await _cache.get_or_load(
+            tuple(community_ids), lambda: self._fetch_communities_scores(community_ids)
+        )
 
-        # 查询价格信息
-        sql_price = """
-        SELECT community_id, latest_month, latest_avg_price, prev_avg_price, mom_ratio
-        FROM public.v_community_listing_price_mom
-        WHERE community_id = ANY($1)
-        """
-        price_rows = await self.db.fetch_all(sql_price, [community_ids])
-        price_map = {row["community_id"]: dict(row) for row in price_rows}
+    async def _fetch_communities_scores(self, community_ids: List[str]) -> List[Dict]:
+        rows = await self.db.fetch_all(SQL_COMMUNITY_SCORES, [community_ids])
+        return [merge_row(row) for row in rows]
 
-        # 合并
-        result = []
-        for cid in community_ids:
-            score = score_map.get(cid, {})
-            price = price_map.get(cid, {})
-            merged = {**score, **price}
-            result.append(merged)
-        return result
+    async def stream_communities_scores(
+        self, community_ids: List[str]
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        按请求顺序分批返回评分详情，不经过结果缓存，用于大批量导出。
+        每批 DB_STREAM_BATCH_SIZE 个 id 单独查询，连接在批次之间归还连接池，
+        下游读得慢时不会长期占用连接和事务。
+        """
+        size = settings.DB_STREAM_BATCH_SIZE
+        for i in range(0, len(community_ids), size):
+            rows = await self.db.fetch_all(
+                SQL_COMMUNITY_SCORES, [community_ids[i : i + size]]
+            )
+            yield [merge_row(row) for row in rows]
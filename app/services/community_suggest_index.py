@@ -0,0 +1,224 @@
+# app/services/community_suggest_index.py
+
+import asyncio
+import heapq
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from app.db import Database
+
+try:
+    import pypinyin
+except ImportError:  # pypinyin 为可选依赖，未安装时只做中文匹配
+    pypinyin = None
+
+SUGGEST_KEYS = (
+    "id",
+    "name",
+    "alias",
+    "circle_code",
+    "circle_name",
+    "district_code",
+    "district_name",
+)
+
+SQL_SUGGEST_ROWS = f"""
+SELECT {", ".join(SUGGEST_KEYS)}
+FROM public.v_community
+"""
+
+# match_type 档位，与 SQL 实现一致：name 前缀 > alias 前缀 > name 包含
+NAME_PREFIX, ALIAS_PREFIX, NAME_INFIX = 0, 1, 2
+
+
+_CJK = re.compile(r"[\u3400-\u9fff]")
+
+
+def _fold(text: Optional[str]) -> str:
+    # 对应 ILIKE 的大小写不敏感
+    return (text or "").casefold()
+
+
+# 只为开头几个字展开多音字的第二读音（如 长宁 -> zhangning / changning），控制 key 数量
+PINYIN_VARIANT_CHARS = 2
+
+
+@lru_cache(maxsize=200_000)
+def pinyin_keys(text: Optional[str]) -> Tuple[str, ...]:
+    """
+    中文名称的全拼与首字母 key，如 张江高科 -> ("zhangjianggaoke", "zjgk")。
+    读音取 pypinyin 的默认读音（词组内按词组读音），开头 PINYIN_VARIANT_CHARS 个多音字
+    另外各生成一组替换为第二读音的 key；非中文字符原样保留（去掉空格）。
+    结果按名称缓存，周期刷新时只需为新增名称计算拼音。
+    """
+    if pypinyin is None or not text or not _CJK.search(text):
+        return ()
+    # 非中文片段加 \0 标记原样返回，这样一次转换即可同时得到全拼与首字母
+    readings = pypinyin.pinyin(
+        text,
+        style=pypinyin.Style.NORMAL,
+        heteronym=True,
+        errors=lambda seg: ["\0" + seg],
+    )
+    default = [r[0] for r in readings]
+    variants = [default]
+    for j, r in enumerate(readings[:PINYIN_VARIANT_CHARS]):
+        if len(r) > 1:
+            variants.append(default[:j] + [r[1]] + default[j + 1 :])
+
+    keys = []
+    for items in variants:
+        keys.append("".join(i.lstrip("\0") for i in items))
+        keys.append("".join(i[1:] if i.startswith("\0") else i[:1] for i in items))
+    return tuple(dict.fromkeys(_fold(k.replace(" ", "")) for k in keys))
+
+
+class _PrefixIndex:
+    """
+    前缀索引：按 key 排序的 (key, rank) 数组，二分定位 [prefix, prefix + U+10FFFF) 区间，
+    相当于压平的 trie，内存紧凑且构建快。同一条记录可以有多个 key。
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, int]]):
+        entries = sorted(set(entries))
+        self.keys: List[str] = [k for k, _ in entries]
+        self.ranks: List[int] = [r for _, r in entries]
+
+    def match(self, prefix: str) -> Iterable[int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return self.ranks[lo:hi]
+
+
+class _Snapshot:
+    """
+    联想索引快照，刷新时整体替换。记录按 name 排序，下标 rank 即排序位置，
+    因此同一档内取最小的 rank 就是 ORDER BY name 的结果。
+    """
+
+    def __init__(self, rows, with_pinyin: bool = False):
+        records = sorted(
+            ({k: row[k] for k in SUGGEST_KEYS} for row in rows),
+            key=lambda r: (r["name"] or "", str(r["id"])),
+        )
+        self.rows: List[Dict[str, Any]] = records
+        self.names: List[str] = [_fold(r["name"]) for r in records]
+        self.aliases: List[str] = [_fold(r["alias"]) for r in records]
+        name_keys = [(n, i) for i, n in enumerate(self.names)]
+        alias_keys = [(a, i) for i, a in enumerate(self.aliases) if a]
+        if with_pinyin:
+            # 拼音 key 与中文前缀放在同一档：拼音命中 name 按 name 前缀排序，命中 alias 按 alias 前缀
+            for i, r in enumerate(records):
+                name_keys.extend((k, i) for k in pinyin_keys(r["name"]))
+                alias_keys.extend((k, i) for k in pinyin_keys(r["alias"]))
+        self.name_prefix = _PrefixIndex(name_keys)
+        self.alias_prefix = _PrefixIndex(alias_keys)
+
+        # name 的单字与二元组倒排表，posting 按 rank 升序，用于包含匹配
+        unigrams: Dict[str, List[int]] = {}
+        bigrams: Dict[str, List[int]] = {}
+        for i, name in enumerate(self.names):
+            for ch in set(name):
+                unigrams.setdefault(ch, []).append(i)
+            for gram in {name[j : j + 2] for j in range(len(name) - 1)}:
+                bigrams.setdefault(gram, []).append(i)
+        self.unigrams = unigrams
+        self.bigrams = bigrams
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _infix_candidates(self, q: str) -> List[int]:
+        """包含 q 的候选（rank 升序），取最短的 posting 再逐个校验。"""
+        if len(q) == 1:
+            return self.unigrams.get(q, [])
+        postings = []
+        for j in range(len(q) - 1):
+            posting = self.bigrams.get(q[j : j + 2])
+            if not posting:
+                return []
+            postings.append(posting)
+        return min(postings, key=len)
+
+    def suggest(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        q = _fold(q)
+        tiers: List[Tuple[int, List[int]]] = []
+        taken = set()
+
+        for match_type, index in (
+            (NAME_PREFIX, self.name_prefix),
+            (ALIAS_PREFIX, self.alias_prefix),
+        ):
+            needed = limit - len(taken)
+            if needed <= 0:
+                break
+            ranks = heapq.nsmallest(
+                needed, {r for r in index.match(q) if r not in taken}
+            )
+            taken.update(ranks)
+            tiers.append((match_type, ranks))
+
+        needed = limit - len(taken)
+        if needed > 0:
+            ranks = []
+            for r in self._infix_candidates(q):
+                if r not in taken and q in self.names[r]:
+                    ranks.append(r)
+                    if len(ranks) >= needed:
+                        break
+            tiers.append((NAME_INFIX, ranks))
+
+        results = []
+        for match_type, ranks in tiers:
+            for r in ranks:
+                rec = dict(self.rows[r])
+                if match_type == ALIAS_PREFIX:
+                    # alias 命中：显示 alias
+                    rec["display_name"] = rec.get("alias") or rec.get("name")
+                else:
+                    rec["display_name"] = rec.get("name")
+                results.append(rec)
+        return results
+
+
+class CommunitySuggestIndex:
+    """
+    /api/community-suggest 的进程内实现，排序规则与 SQL 版本一致，未加载时由调用方回退到 SQL。
+    另外支持全拼/首字母前缀匹配（SQL 版本不支持）。
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[_Snapshot] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    async def load(self):
+        with_pinyin = settings.SUGGEST_PINYIN_ENABLED
+        if with_pinyin and pypinyin is None:
+            print(
+                "⚠️ SUGGEST_PINYIN_ENABLED is set but 'pypinyin' is not installed, "
+                "pinyin matching disabled."
+            )
+            with_pinyin = False
+        rows = await Database.fetch_all(SQL_SUGGEST_ROWS)
+        snapshot = await asyncio.to_thread(_Snapshot, rows, with_pinyin)
+        self._snapshot = snapshot
+        print(
+            f"✅ Community suggest index loaded ({len(snapshot)} communities"
+            f"{', with pinyin' if with_pinyin else ''})."
+        )
+
+    def suggest(self, q: str, limit: int = 10) -> List[Dict[str, Any]]:
+        snap = self._snapshot
+        if snap is None:
+            raise RuntimeError("Community suggest index is not loaded")
+        return snap.suggest(q, limit)
+
+
+# 单例
+community_suggest_index = CommunitySuggestIndex()
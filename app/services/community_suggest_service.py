@@ -1,5 +1,6 @@
 from typing import List, Dict, Any
 from app.db import Database
+from app.services.community_suggest_index import community_suggest_index
 
 
 class CommunitySuggestService:
@@ -15,6 +16,10 @@ class CommunitySuggestService:
         if not q:
             return []
 
+        # 内存索引已加载时直接在进程内匹配，否则回退到 SQL
+        if community_suggest_index.ready:
+            return community_suggest_index.suggest(q, limit)
+
         # 使用 ILIKE 和 % 匹配来做前缀和模糊，优先 name 前缀
         sql = """
         SELECT id, name, alias, circle_code, circle_name, district_code, district_name,
@@ -0,0 +1,157 @@
+# app/services/data_reloader.py
+
+import asyncio
+import importlib.util
+import os
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import keyword_config
+from app.services import jieba_custom_dict, weight_infer_local
+from app.services.keyword_matcher import config_categories, keyword_matcher
+from app.services.location_mapper import DATA_DIR, mapper
+from app.services.nlp_executor import nlp_executor
+from app.services.segmenter import segment
+from app.utils import metrics
+from app.utils.periodic import run_periodically
+
+# 变更后需要重载的数据文件
+WATCHED_FILES = (
+    str(DATA_DIR / "district.csv"),
+    str(DATA_DIR / "circle.csv"),
+    str(DATA_DIR / "location_alias.csv"),
+    keyword_config.__file__,
+)
+
+
+def _file_keys() -> Dict[str, Optional[Tuple[int, int]]]:
+    """各文件的 (mtime_ns, size)，文件不存在时为 None。"""
+    keys = {}
+    for path in WATCHED_FILES:
+        try:
+            st = os.stat(path)
+            keys[path] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            keys[path] = None
+    return keys
+
+
+def _load_keyword_config() -> ModuleType:
+    """从源文件执行一份新的 keyword_config，不影响已导入的模块；语法错误等在这里暴露。"""
+    spec = importlib.util.spec_from_file_location(
+        keyword_config.__name__, keyword_config.__file__
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _build(config: ModuleType) -> Dict[str, Any]:
+    """在线程中构建全部新数据，任何一步失败都不会影响正在使用的旧数据。"""
+    return {
+        "keyword_index": weight_infer_local.rebuild_keyword_index(config.WEIGHT_KEYWORDS),
+        "location": mapper.build(),
+        "automaton": keyword_matcher.build(config_categories(config)),
+        "jieba": jieba_custom_dict.build_dictionary(config),
+    }
+
+
+def _swap(config: ModuleType, built: Dict[str, Any]):
+    """替换全部数据。只有同步赋值，在事件循环中调用时整体完成，期间不会处理其他请求。"""
+    vars(keyword_config).update((k, v) for k, v in vars(config).items() if k.isupper())
+    weight_infer_local.swap_keyword_index(built["keyword_index"])
+    mapper.swap(built["location"])
+    keyword_matcher.swap(built["automaton"])
+    jieba_custom_dict.swap_dictionary(*built["jieba"])
+    segment.cache_clear()
+
+
+def apply_from_disk():
+    """同步地从磁盘重新加载并替换全部数据，供 fork 方式重建的 NLP 工作进程初始化时调用。"""
+    config = _load_keyword_config()
+    _swap(config, _build(config))
+
+
+class DataReloader:
+    """
+    地名 CSV 与 keyword_config 的热重载：新的映射、关键词自动机、权重倒排索引与 jieba 词典
+    全部在后台线程构建成功、进程模式下新的 NLP 工作进程也启动完成后，才在同一步中整体替换
+    （copy-on-write），请求路径不加锁、不阻塞；任何一步失败都保留旧数据。
+    """
+
+    def __init__(self):
+        self._lock: Optional[asyncio.Lock] = None
+        self._file_keys: Optional[Dict[str, Optional[Tuple[int, int]]]] = None
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload_at: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.watching = False
+
+    async def reload(self, reason: str = "manual") -> Dict[str, Any]:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            start = time.perf_counter()
+            try:
+                # 先记录文件状态再读取，读取期间发生的修改会在下一次检查时再触发重载
+                file_keys = await asyncio.to_thread(_file_keys)
+                config = await asyncio.to_thread(_load_keyword_config)
+                built = await asyncio.to_thread(_build, config)
+                # 先写词典缓存，新工作进程启动时直接加载新词典
+                await asyncio.to_thread(
+                    jieba_custom_dict.dump_dictionary_cache, *built["jieba"], config
+                )
+                # 新工作进程在替换前启动：启动失败时主进程与旧工作进程都保持旧数据
+                executor = await nlp_executor.prepare_restart()
+            except Exception as e:
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠️ Data reload ({reason}) failed: {self.last_error}")
+                raise
+
+            # 主进程数据与工作进程在同一步中替换，中间没有 await
+            _swap(config, built)
+            nlp_executor.finish_restart(executor)
+            # 全部替换完成后才记录文件状态，失败时文件监控会在下次检查时重试
+            self._file_keys = file_keys
+            self.reloads += 1
+            self.last_reload_at = time.time()
+            self.last_duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            self.last_error = None
+            print(f"✅ Data reloaded ({reason}, {self.last_duration_ms:.0f}ms).")
+            return {
+                **mapper.stats(),
+                "keyword_labels": len(keyword_matcher.labels),
+                "duration_ms": self.last_duration_ms,
+            }
+
+    async def check(self):
+        """文件有变化时重载。"""
+        file_keys = await asyncio.to_thread(_file_keys)
+        if file_keys != self._file_keys:
+            await self.reload("file change")
+
+    def watch(self, interval: float) -> asyncio.Task:
+        """以启动时的文件状态为基准，每隔 interval 秒检查一次。"""
+        self._file_keys = _file_keys()
+        self.watching = True
+        return run_periodically(interval, self.check, "data_reload_watch")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watching": self.watching,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_reload_at": self.last_reload_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            **mapper.stats(),
+        }
+
+
+# 单例
+data_reloader = DataReloader()
+metrics.register("data_reload", data_reloader.stats)
@@ -1,8 +1,11 @@
 import re
 import json
+import asyncio
+import importlib.util
 import httpx
 from typing import Optional
 from app.core.config import settings
+from app.utils import metrics
 
 
 class DeepSeekClient:
@@ -15,6 +18,46 @@ class DeepSeekClient:
             "Content-Type": "application/json",
         }
 
+        # 长连接客户端与并发控制，在 FastAPI lifespan 中 start/aclose
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+
+    async def start(self):
+        if self._client is not None:
+            return
+        http2 = settings.DEEPSEEK_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("⚠️ DEEPSEEK_HTTP2 is enabled but 'h2' is not installed, using HTTP/1.1.")
+            http2 = False
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            http2=http2,
+            timeout=settings.DEEPSEEK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=settings.DEEPSEEK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.DEEPSEEK_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.DEEPSEEK_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(settings.DEEPSEEK_MAX_CONCURRENCY)
+        print("✅ DeepSeek HTTP client created.")
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            print("🛑 DeepSeek HTTP client closed.")
+
+    def stats(self) -> dict:
+        return {
+            "started": self._client is not None,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": settings.DEEPSEEK_MAX_CONCURRENCY,
+        }
+
     async def call(
         self,
         prompt: str,
@@ -29,12 +72,24 @@ class DeepSeekClient:
             "web_search": web_search,  # 关键参数，启用联网搜索
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.api_url, json=payload, headers=self.headers, timeout=30
-            )
+        # 未经 lifespan 启动（如脚本中直接调用）时按需创建
+        if self._client is None:
+            await self.start()
+
+        # 等待期间被取消（超时、客户端断开）也要扣减等待数
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            response = await self._client.post(self.api_url, json=payload)
             response.raise_for_status()
             result = response.json()
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
 
         content = result["choices"][0]["message"]["content"]
         match = re.search(r"\{[\s\S]*\}", content)
@@ -46,3 +101,4 @@ class DeepSeekClient:
 
 # 单例导出
 deepseek_client = DeepSeekClient()
+metrics.register("deepseek", deepseek_client.stats)
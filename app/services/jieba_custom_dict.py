@@ -1,18 +1,20 @@
+import hashlib
+import marshal
+import os
+import time
+from types import ModuleType
+from typing import Tuple
 import jieba
-from app.config.keyword_config import (
-    WEIGHT_KEYWORDS,
-    PURPOSE_KEYWORDS,
-    FAMILY_STATUS_KEYWORDS,
-    PREFERENCE_KEYWORDS,
-)
+from app.core.config import settings
+from app.config import keyword_config
 
 
-def add_all_custom_words():
+def _custom_words(config: ModuleType = keyword_config) -> set:
     keyword_dicts = [
-        WEIGHT_KEYWORDS,
-        PURPOSE_KEYWORDS,
-        FAMILY_STATUS_KEYWORDS,
-        PREFERENCE_KEYWORDS,
+        config.WEIGHT_KEYWORDS,
+        config.PURPOSE_KEYWORDS,
+        config.FAMILY_STATUS_KEYWORDS,
+        config.PREFERENCE_KEYWORDS,
     ]
     words = set()
     for d in keyword_dicts:
@@ -21,5 +23,105 @@ def add_all_custom_words():
                 words.update(v)
             else:
                 words.add(v)
-    for word in words:
+    return words
+
+
+def add_all_custom_words():
+    for word in _custom_words():
         jieba.add_word(word)
+
+
+def _fingerprint(words: set) -> str:
+    """jieba 版本 + 主词典文件 + 自定义词集合，任一变化都会使缓存失效。"""
+    # 只解析路径，不打开文件（get_dict_file() 打开的文件对象不会被关闭）
+    dict_path = jieba.dt.dictionary or os.path.join(
+        os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME
+    )
+    st = os.stat(dict_path)
+    raw = "\n".join(
+        [jieba.__version__, dict_path, str(st.st_size), str(st.st_mtime_ns)]
+        + sorted(words)
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def init_jieba(cache_path: str = None):
+    """
+    初始化 jieba 并加入全部自定义词。
+    加入自定义词后的前缀词典（FREQ/total）序列化到 cache_path，
+    之后启动的进程直接加载，跳过词典构建与逐词 add_word。
+    """
+    cache_path = cache_path or settings.JIEBA_CACHE_PATH
+    start = time.perf_counter()
+    words = _custom_words()
+    fingerprint = _fingerprint(words)
+
+    if settings.JIEBA_DICT_CACHE and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f:
+                # 整体读入后 loads，比 marshal.load(f) 逐块读取快得多
+                cached_fingerprint, freq, total = marshal.loads(f.read())
+            if cached_fingerprint == fingerprint:
+                with jieba.dt.lock:
+                    jieba.dt.FREQ, jieba.dt.total = freq, total
+                    jieba.dt.initialized = True
+                print(
+                    f"✅ jieba dictionary loaded from cache "
+                    f"({time.perf_counter() - start:.3f}s)."
+                )
+                return
+        except Exception as e:
+            print(f"⚠️ Load jieba dictionary cache failed: {e}")
+
+    jieba.initialize()
+    add_all_custom_words()
+    print(f"✅ jieba dictionary built ({time.perf_counter() - start:.3f}s).")
+    _dump_cache(cache_path, fingerprint, jieba.dt.FREQ, jieba.dt.total)
+
+
+def _dump_cache(cache_path: str, fingerprint: str, freq: dict, total: int):
+    if not settings.JIEBA_DICT_CACHE:
+        return
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            marshal.dump((fingerprint, freq, total), f)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"⚠️ Dump jieba dictionary cache failed: {e}")
+
+
+def build_dictionary(config: ModuleType = keyword_config) -> Tuple[dict, int]:
+    """
+    在独立的 Tokenizer 上从主词典重新构建前缀词典并加入 config 中的自定义词，
+    返回 (FREQ, total)。不修改全局 jieba.dt，已删除的自定义词也不会残留。
+    """
+    tokenizer = jieba.Tokenizer(jieba.dt.dictionary)
+    tokenizer.FREQ, tokenizer.total = tokenizer.gen_pfdict(tokenizer.get_dict_file())
+    tokenizer.initialized = True
+    for word in _custom_words(config):
+        tokenizer.add_word(word)
+    return tokenizer.FREQ, tokenizer.total
+
+
+def swap_dictionary(freq: dict, total: int):
+    """整体替换全局 jieba.dt 的前缀词典。"""
+    with jieba.dt.lock:
+        jieba.dt.FREQ, jieba.dt.total = freq, total
+        jieba.dt.initialized = True
+
+
+def dump_dictionary_cache(
+    freq: dict,
+    total: int,
+    config: ModuleType = keyword_config,
+    cache_path: str = None,
+):
+    """把 build_dictionary 的结果写入词典缓存，之后启动的进程（含重建的工作进程）直接加载。"""
+    _dump_cache(
+        cache_path or settings.JIEBA_CACHE_PATH,
+        _fingerprint(_custom_words(config)),
+        freq,
+        total,
+    )
@@ -0,0 +1,112 @@
+from collections import deque
+from types import ModuleType
+from typing import Dict, List, Tuple
+
+from app.config import keyword_config
+
+
+def config_categories(
+    config: ModuleType = keyword_config,
+) -> Dict[str, Dict[str, List[str]]]:
+    """keyword_config 中参与文本匹配的关键词表：类别 -> {标签: [关键词, ...]}。"""
+    return {
+        "weight": config.WEIGHT_KEYWORDS,
+        "purpose": config.PURPOSE_KEYWORDS,
+        "family_status": config.FAMILY_STATUS_KEYWORDS,
+        "preference": config.PREFERENCE_KEYWORDS,
+    }
+
+
+class KeywordMatcher:
+    """
+    基于 Aho-Corasick 自动机的多类别关键词匹配。
+    所有类别的关键词构建成一个自动机，对文本做一次线性扫描即可得到各类别命中的标签，
+    耗时与关键词数量无关。与 `any(word in text for word in v)` 一样按子串匹配，
+    重叠的关键词（如“学区”与“学区房”）都会命中。
+    """
+
+    def __init__(self, categories: Dict[str, Dict[str, List[str]]] = None):
+        self._automaton = self.build(categories)
+
+    @staticmethod
+    def build(categories: Dict[str, Dict[str, List[str]]] = None) -> tuple:
+        """
+        构建自动机，返回 (标签, 类别, goto, fail, out)。
+        不修改当前实例，重载时可在线程中构建，再用 swap 整体替换。
+        """
+        categories = categories if categories is not None else config_categories()
+
+        # 标签按配置顺序编号，输出时按编号排序即可还原配置顺序
+        labels: List[Tuple[str, str]] = []
+
+        # goto[node]: 字符 -> 子节点；out[node]: 在该节点结束的标签编号
+        goto: List[Dict[str, int]] = [{}]
+        out: List[set] = [set()]
+        for category, mapping in categories.items():
+            for label, words in mapping.items():
+                label_id = len(labels)
+                labels.append((category, label))
+                for word in words if isinstance(words, list) else [words]:
+                    node = 0
+                    for ch in word:
+                        nxt = goto[node].get(ch)
+                        if nxt is None:
+                            nxt = goto[node][ch] = len(goto)
+                            goto.append({})
+                            out.append(set())
+                        node = nxt
+                    out[node].add(label_id)
+
+        # BFS 构建失败指针，并把失败链上的输出合并到当前节点
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0)
+                out[child] |= out[fail[child]]
+                queue.append(child)
+        return (
+            labels,
+            list(categories),
+            goto,
+            fail,
+            [tuple(sorted(o)) for o in out],
+        )
+
+    def swap(self, automaton: tuple):
+        self._automaton = automaton
+
+    @property
+    def labels(self) -> List[Tuple[str, str]]:
+        return self._automaton[0]
+
+    @property
+    def categories(self) -> List[str]:
+        return self._automaton[1]
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """返回 {类别: [命中的标签, ...]}，标签顺序与配置一致；未命中的类别为空列表。"""
+        # 只取一次引用，匹配过程中发生替换也不会混用新旧两份表
+        labels, categories, goto, fail, out = self._automaton
+        hits = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                hits.update(out[node])
+
+        result: Dict[str, List[str]] = {c: [] for c in categories}
+        for label_id in sorted(hits):
+            category, label = labels[label_id]
+            result[category].append(label)
+        return result
+
+
+# 单例
+keyword_matcher = KeywordMatcher()
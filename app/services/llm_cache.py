@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.deepseek_client import deepseek_client
+from app.utils import metrics
+
+_MISSING = object()
+
+
+def normalize_text(text: str) -> str:
+    """全角转半角、合并空白、忽略大小写，让几乎相同的需求文本命中同一条缓存。"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+class LLMCache:
+    """
+    LLM 解析结果的本地持久化缓存（SQLite）。
+    key 由 规范化文本 + prompt 模板哈希 + 模型 + temperature 组成，
+    修改 prompt 模板后旧条目自然失效；条目数超过上限时按最近访问时间淘汰。
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._count = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(template: str, text: str, model: str, temperature: float) -> str:
+        template_hash = hashlib.sha256(template.encode("utf-8")).hexdigest()
+        raw = json.dumps(
+            [normalize_text(text), template_hash, model, temperature], ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)"
+            )
+            self._count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _get(self, key: str) -> Any:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return _MISSING
+            conn.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            conn.commit()
+            return json.loads(row[0])
+
+    def _put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            # 写入只发生在未命中时（已付出一次 LLM 调用），重新计数的开销可以忽略
+            self._count = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            if self._count > self.max_entries:
+                overflow = self._count - self.max_entries
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN "
+                    "(SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+            conn.commit()
+
+    async def call(
+        self,
+        template: str,
+        text: str,
+        prompt: str,
+        model: str = "deepseek-chat",
+        temperature: float = 0.2,
+    ) -> Optional[dict]:
+        """先查缓存，未命中时调用 deepseek_client 并写入缓存（空结果不缓存）。"""
+        if not settings.LLM_CACHE_ENABLED:
+            return await deepseek_client.call(prompt, model=model, temperature=temperature)
+
+        key = self.make_key(template, text, model, temperature)
+        try:
+            cached = await asyncio.to_thread(self._get, key)
+        except Exception as e:
+            print(f"⚠️ LLM cache read failed: {e}")
+            cached = _MISSING
+        if cached is not _MISSING:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        result = await deepseek_client.call(prompt, model=model, temperature=temperature)
+        if result:
+            try:
+                await asyncio.to_thread(self._put, key, result)
+            except Exception as e:
+                print(f"⚠️ LLM cache write failed: {e}")
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "entries": self._count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+# 单例
+llm_cache = LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_ENTRIES)
+metrics.register("llm_cache", llm_cache.stats)
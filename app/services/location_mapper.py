@@ -1,24 +1,79 @@
 import csv
 from pathlib import Path
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Optional, Set, Tuple, List
 from flashtext import KeywordProcessor
+from app.core.config import settings
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 
+# 参与容错匹配的最短名称长度：两个字的名称错一个字就是另一个词，误匹配太多
+FUZZY_MIN_LEN = 3
+# 允许替换一个字的最短名称长度：三个字的名称替换一个字后常是普通词语
+# （动物园 -> 植物园、大学生 -> 大学城），只允许相邻交换与多一个字
+FUZZY_SUBSTITUTION_MIN_LEN = 4
 
-class LocationMapper:
-    def __init__(self):
+
+def _deletes(term: str) -> Set[str]:
+    """删除任意一个字得到的所有字符串（SymSpell 的删除变体）。"""
+    return {term[:i] + term[i + 1 :] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str, substitution: bool = True) -> bool:
+    """a、b 的编辑距离（替换/插入/删除/相邻交换）是否不超过 1；substitution=False 时不计替换。"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+    i = 0
+    while i < la and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        if substitution and a[i + 1 :] == b[i + 1 :]:
+            return True  # 替换一个字
+        # 相邻两字顺序颠倒
+        return (
+            i + 1 < la
+            and a[i] == b[i + 1]
+            and a[i + 1] == b[i]
+            and a[i + 2 :] == b[i + 2 :]
+        )
+    return a[i:] == b[i + 1 :]  # b 比 a 多一个字
+
+
+class _Snapshot:
+    """一次加载得到的区/板块映射与抽取器，构建完成后只读，重载时整体替换。"""
+
+    def __init__(self, fuzzy: bool):
         # 原始映射表
         self.district_map: Dict[str, str] = {}
         self.circle_map: Dict[Tuple[str, str], str] = {}
+        # 区/板块层级（按编码）：板块 -> 所属区，区 -> 下辖板块
+        self.circle_district: Dict[str, str] = {}
+        self.district_circles: Dict[str, List[str]] = {}
+        # circle.csv 收录的全部板块编码（排序），SQL 回退匹配时排除这些板块
+        self.known_circles: Tuple[str, ...] = ()
+        # 别名 -> 标准名称（可对应多个，如 莘庄 -> 莘庄南广场/莘庄北广场）
+        self.district_aliases: Dict[str, List[str]] = {}
+        self.circle_aliases: Dict[str, List[str]] = {}
         # FlashText 关键词处理器
         self.district_proc = KeywordProcessor(case_sensitive=False)
         self.circle_proc = KeywordProcessor(case_sensitive=False)
+        # 容错匹配：删除变体 -> 名称/别名，名称/别名 -> (类型, 标准名称列表)
+        self.fuzzy = fuzzy
+        self._fuzzy_index: Dict[str, Set[str]] = {}
+        self._fuzzy_terms: Dict[str, Tuple[str, List[str]]] = {}
+        self._fuzzy_max_len = 0
+        self._fuzzy_chars: Set[str] = set()
 
         self._load_districts()
         self._load_circles()
+        self._load_aliases()
         self._build_processors()
+        self._build_fuzzy_index()
 
     def _load_districts(self):
         path = DATA_DIR / "district.csv"
@@ -39,19 +94,112 @@ class LocationMapper:
                 code = row["code"].strip()
                 district_code = row["district_code"].strip()
                 self.circle_map[name] = code
+                self.circle_district[code] = district_code
+                self.district_circles.setdefault(district_code, []).append(code)
+        self.known_circles = tuple(sorted(self.circle_district))
+
+    def _load_aliases(self):
+        """别名表 location_alias.csv：alias,type(district/circle),name；文件可选。"""
+        path = DATA_DIR / "location_alias.csv"
+        if not path.exists():
+            return
+        targets = {
+            "district": (self.district_map, self.district_aliases),
+            "circle": (self.circle_map, self.circle_aliases),
+        }
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                alias, kind, name = (row[k].strip() for k in ("alias", "type", "name"))
+                if kind not in targets or name not in targets[kind][0]:
+                    print(f"⚠️ Unknown location alias target: {alias} -> {kind}/{name}")
+                    continue
+                names = targets[kind][1].setdefault(alias, [])
+                if name not in names:
+                    names.append(name)
 
     def _build_processors(self):
+        # 关键词的 clean_name 统一为标准名称，抽取结果无需再去后缀
         # 区名处理器，加入“区”“新区”后缀
         for name in self.district_map.keys():
-            self.district_proc.add_keyword(name)
-            self.district_proc.add_keyword(f"{name}区")
-            self.district_proc.add_keyword(f"{name}新区")
+            self.district_proc.add_keyword(name, name)
+            self.district_proc.add_keyword(f"{name}区", name)
+            self.district_proc.add_keyword(f"{name}新区", name)
         # 商圈处理器
         for name in self.circle_map.keys():
-            self.circle_proc.add_keyword(name)
+            self.circle_proc.add_keyword(name, name)
             # 如有“板块”或“片区”后缀可按需加入
-            self.circle_proc.add_keyword(f"{name}板块")
-            self.circle_proc.add_keyword(f"{name}片区")
+            self.circle_proc.add_keyword(f"{name}板块", name)
+            self.circle_proc.add_keyword(f"{name}片区", name)
+        # 别名可能对应多个标准名称，clean_name 用别名本身，抽取后再展开
+        for alias in self.district_aliases:
+            if alias not in self.district_map:
+                self.district_proc.add_keyword(alias, alias)
+        for alias in self.circle_aliases:
+            if alias not in self.circle_map:
+                self.circle_proc.add_keyword(alias, alias)
+
+    def _build_fuzzy_index(self):
+        terms: Dict[str, Tuple[str, List[str]]] = {}
+        for name in self.district_map:
+            terms[name] = ("district", [name])
+        for alias, names in self.district_aliases.items():
+            terms.setdefault(alias, ("district", names))
+        for name in self.circle_map:
+            terms[name] = ("circle", [name])
+        for alias, names in self.circle_aliases.items():
+            terms.setdefault(alias, ("circle", names))
+
+        for term, target in terms.items():
+            if len(term) < FUZZY_MIN_LEN:
+                continue
+            self._fuzzy_terms[term] = target
+            self._fuzzy_max_len = max(self._fuzzy_max_len, len(term))
+            self._fuzzy_chars.update(term)
+            for key in {term} | _deletes(term):
+                self._fuzzy_index.setdefault(key, set()).add(term)
+
+    def _fuzzy_lookup(self, window: str) -> Optional[str]:
+        """
+        返回与 window 编辑距离不超过 1 的名称/别名（多个候选时取最长、再按字典序）。
+        短于 FUZZY_SUBSTITUTION_MIN_LEN 的名称不接受替换。
+        """
+        candidates = set()
+        for key in {window} | _deletes(window):
+            candidates |= self._fuzzy_index.get(key, set())
+        matched = [
+            t
+            for t in candidates
+            if _within_one_edit(window, t, len(t) >= FUZZY_SUBSTITUTION_MIN_LEN)
+        ]
+        if not matched:
+            return None
+        return min(matched, key=lambda t: (-len(t), t))
+
+    def _fuzzy_extract(self, text: str) -> Tuple[List[str], List[str]]:
+        """从左到右滑动窗口，优先匹配更长的窗口，命中后跳过该窗口。"""
+        district_names: List[str] = []
+        circle_names: List[str] = []
+        # foreign[k]：text[:k] 中不出现在任何名称里的字数。编辑距离 1 的窗口最多含一个这样的字，
+        # 据此跳过绝大多数窗口，长文本也能保持在亚毫秒级
+        foreign = [0]
+        for ch in text:
+            foreign.append(foreign[-1] + (ch not in self._fuzzy_chars))
+        i = 0
+        while i <= len(text) - FUZZY_MIN_LEN:
+            longest = min(self._fuzzy_max_len + 1, len(text) - i)
+            for size in range(longest, FUZZY_MIN_LEN - 1, -1):
+                if foreign[i + size] - foreign[i] > 1:
+                    continue
+                term = self._fuzzy_lookup(text[i : i + size])
+                if term is not None:
+                    kind, names = self._fuzzy_terms[term]
+                    target = district_names if kind == "district" else circle_names
+                    target.extend(n for n in names if n not in target)
+                    i += size
+                    break
+            else:
+                i += 1
+        return district_names, circle_names
 
     def get_district_code(self, district_name: str) -> Optional[str]:
         return self.district_map.get(district_name.strip())
@@ -59,30 +207,112 @@ class LocationMapper:
     def get_circle_code(self, circle_name: str) -> Optional[str]:
         return self.circle_map.get((circle_name.strip()))
 
+    def get_circle_district(self, circle_code: str) -> Optional[str]:
+        return self.circle_district.get(circle_code)
+
+    def resolve_region(
+        self,
+        district_codes: Optional[List[str]],
+        circle_codes: Optional[List[str]],
+    ) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """
+        把需求中的区、板块编码归一为 (板块编码, 区编码)，均去重排序：
+        区展开为其下辖全部板块，使区域过滤主要落在 circle_code = ANY(...) 上；
+        区编码仍一并返回，用于匹配 circle_code 未被 circle.csv 收录的小区（按小区自身的区编码回退）。
+        区、板块都为空时返回 None，表示不限区域。
+        """
+        if not district_codes and not circle_codes:
+            return None
+        codes = set(circle_codes or [])
+        for district_code in district_codes or []:
+            circles = self.district_circles.get(district_code)
+            if circles is None:
+                print(f"⚠️ Unknown district code {district_code}, matching by district column only.")
+                continue
+            codes.update(circles)
+        return tuple(sorted(codes)), tuple(sorted(set(district_codes or [])))
+
     def extract(self, text: str) -> Tuple[List[str], List[str]]:
         """
-        用 FlashText 从文本里抽取 district_names 和 circle_names（原始名称，不含“区”“板块”等后缀）。
+        用 FlashText 从文本里抽取 district_names 和 circle_names
+        （标准名称，不含“区”“板块”等后缀，别名已展开为标准名称）。
+        精确匹配一个都没有命中时，再按编辑距离 1 做容错匹配（如 陆家咀 -> 陆家嘴）。
         返回 ([district_name,...], [circle_name,...])。
         """
-        # 抽取原始关键词
-        raw_districts = self.district_proc.extract_keywords(text)
-        raw_circles = self.circle_proc.extract_keywords(text)
-
-        # 清洗后缀，统一成原始名称
-        district_names = []
-        for d in raw_districts:
-            name = d.rstrip("区新区")
-            if name not in district_names:
-                district_names.append(name)
-
-        circle_names = []
-        for c in raw_circles:
-            name = c.rstrip("板块片区商圈")
-            if name not in circle_names:
-                circle_names.append(name)
+        circle_hits = self.circle_proc.extract_keywords(text, span_info=True)
+        circle_names: List[str] = []
+        for c, _start, _end in circle_hits:
+            for name in [c] if c in self.circle_map else self.circle_aliases[c]:
+                if name not in circle_names:
+                    circle_names.append(name)
+
+        district_names: List[str] = []
+        for d, start, end in self.district_proc.extract_keywords(text, span_info=True):
+            if d not in self.district_map:
+                # 区别名落在板块名称内时不算（如 闸北公园 中的 闸北）
+                if any(s <= start and end <= e for _c, s, e in circle_hits):
+                    continue
+                names = self.district_aliases[d]
+            else:
+                names = [d]
+            for name in names:
+                if name not in district_names:
+                    district_names.append(name)
 
+        if not district_names and not circle_names and self.fuzzy:
+            return self._fuzzy_extract(text)
         return district_names, circle_names
 
 
+class LocationMapper:
+    """
+    区/板块映射与抽取。数据放在只读快照中，reload 时在后台构建新快照再整体替换（copy-on-write），
+    读者每次调用只取一次快照引用，无需加锁，也不会看到新旧混合的数据。
+    """
+
+    def __init__(self, fuzzy: Optional[bool] = None):
+        self._fuzzy = fuzzy
+        self._snapshot = self.build()
+
+    def build(self) -> _Snapshot:
+        """从 data/ 下的 CSV 构建新快照（不影响当前快照），可在线程中执行。"""
+        return _Snapshot(
+            settings.LOCATION_FUZZY_ENABLED if self._fuzzy is None else self._fuzzy
+        )
+
+    def swap(self, snapshot: _Snapshot):
+        self._snapshot = snapshot
+
+    def stats(self) -> Dict[str, int]:
+        snap = self._snapshot
+        return {
+            "districts": len(snap.district_map),
+            "circles": len(snap.circle_map),
+            "aliases": len(snap.district_aliases) + len(snap.circle_aliases),
+        }
+
+    def get_district_code(self, district_name: str) -> Optional[str]:
+        return self._snapshot.get_district_code(district_name)
+
+    def get_circle_code(self, circle_name: str) -> Optional[str]:
+        return self._snapshot.get_circle_code(circle_name)
+
+    def get_circle_district(self, circle_code: str) -> Optional[str]:
+        return self._snapshot.get_circle_district(circle_code)
+
+    def known_circle_codes(self) -> Tuple[str, ...]:
+        return self._snapshot.known_circles
+
+    def resolve_region(
+        self,
+        district_codes: Optional[List[str]],
+        circle_codes: Optional[List[str]],
+    ) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        return self._snapshot.resolve_region(district_codes, circle_codes)
+
+    def extract(self, text: str) -> Tuple[List[str], List[str]]:
+        return self._snapshot.extract(text)
+
+
 # 单例
 mapper = LocationMapper()
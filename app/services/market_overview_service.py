@@ -1,11 +1,24 @@
 from typing import Optional, Dict, Any
 from app.db import Database
+from app.core.config import settings
+from app.utils.cache import AsyncCache
 import json
 
+# 市场概览每天至多更新一次，缓存最新一条
+_cache = AsyncCache(
+    settings.READ_CACHE_TTL_SECONDS, max_entries=1, name="market_overview"
+)
+
 
 class MarketOverviewService:
     @staticmethod
     async def get_latest_overview() -> Optional[Dict[str, Any]]:
+        return await _cache.get_or_load(
+            "latest", MarketOverviewService._fetch_latest_overview
+        )
+
+    @staticmethod
+    async def _fetch_latest_overview() -> Optional[Dict[str, Any]]:
         sql = """
         SELECT id, snapshot_date, overview_data, data_source, created_at, updated_at
         FROM public.sh_secondhand_market_overview
@@ -1,25 +1,81 @@
+import asyncio
 import os
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+FILE_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../data/sh_realestate_market_stats.json")
+)
+
+
+def _parse(data: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(data, list) and data:
+        return data[0]  # 返回最新一条
+    elif isinstance(data, dict):
+        return data
+    else:
+        return None
+
+
+def _load_file(path: str) -> Tuple[Optional[Dict[str, Any]], Optional[bytes]]:
+    """读取并解析数据文件，同时预先序列化好接口响应体。"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = _parse(json.load(f))
+    if data is None:
+        return None, None
+    body = json.dumps({"data": data}, ensure_ascii=False).encode("utf-8")
+    return data, body
 
 
 class MarketStatsService:
-    @staticmethod
-    def get_latest_stats() -> Optional[Dict[str, Any]]:
-        file_path = os.path.join(
-            os.path.dirname(__file__), "../../data/sh_realestate_market_stats.json"
-        )
-        file_path = os.path.abspath(file_path)
-        if not os.path.exists(file_path):
-            return None
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list) and data:
-                return data[0]  # 返回最新一条
-            elif isinstance(data, dict):
-                return data
-            else:
-                return None
-        except Exception:
-            return None
+    """
+    市场统计数据常驻内存：文件只在 mtime/size 变化时重新加载，
+    stat 与读取都放到线程中执行，请求路径上不做阻塞的磁盘 I/O。
+    """
+
+    _data: Optional[Dict[str, Any]] = None
+    _body: Optional[bytes] = None
+    _file_key: Optional[Tuple[int, int]] = None
+    _checked_at: float = float("-inf")
+    _lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def _refresh(cls):
+        now = time.monotonic()
+        if now - cls._checked_at < settings.MARKET_STATS_CHECK_INTERVAL_SECONDS:
+            return
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if now - cls._checked_at < settings.MARKET_STATS_CHECK_INTERVAL_SECONDS:
+                return
+            try:
+                st = await asyncio.to_thread(os.stat, FILE_PATH)
+            except FileNotFoundError:
+                cls._data, cls._body, cls._file_key = None, None, None
+                cls._checked_at = time.monotonic()
+                return
+
+            file_key = (st.st_mtime_ns, st.st_size)
+            if file_key != cls._file_key:
+                try:
+                    cls._data, cls._body = await asyncio.to_thread(_load_file, FILE_PATH)
+                    cls._file_key = file_key
+                except Exception as e:
+                    # 文件可能正在写入，保留上一次的有效数据，下次检查时重试
+                    print(f"⚠️ Load market stats failed: {e}")
+            cls._checked_at = time.monotonic()
+
+    @classmethod
+    async def get_latest_stats(cls) -> Optional[Dict[str, Any]]:
+        await cls._refresh()
+        return cls._data
+
+    @classmethod
+    async def get_latest_stats_json(cls) -> Optional[bytes]:
+        """返回预序列化的 {"data": ...} 响应体。"""
+        await cls._refresh()
+        return cls._body
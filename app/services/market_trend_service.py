@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.deepseek_client import deepseek_client
+from app.utils import metrics
+
+MARKET_TREND_PROMPT = """
+请以严格的 JSON 格式返回“截至目前最新的上海二手房市场成交情况”，并包含以下字段：
+
+{
+  "截至日期": "YYYY-MM-DD",
+  "近期成交": [
+    {
+      "日期": "YYYY-MM-DD",
+      "成交套数": 数字,
+      "环比变化": {
+        "套数变化": 数字,
+        "百分比变化": "±XX.X%"
+      },
+      "周均套数": 数字,
+      "超周均百分比": "±XX.X%"
+    }
+  ],
+  "月度成交": [
+    {
+      "月份": "YYYY-MM",
+      "累计成交套数": 数字,
+      "日均套数": 数字,
+      "同比变化": "±XX.X%"
+    }
+  ],
+  "市场趋势": {
+        "成交量趋势": "字符串",
+        "价格走势": "字符串"
+      }
+    }
+    """
+
+# 刷新失败后的重试间隔，避免上游不可用时每个请求都去调用 LLM
+RETRY_INTERVAL_SECONDS = 60
+
+
+def _read_file(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_file(path: str, content: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(content, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class MarketTrendService:
+    """
+    市场走势（联网 LLM 查询）的 stale-while-revalidate 缓存：
+    - 有结果时立即返回，过期后在后台刷新；
+    - 并发的刷新请求合并为一次上游调用；
+    - 最近一次成功结果落盘，重启后直接加载，不会集中打到 LLM。
+    """
+
+    _data: Optional[Dict[str, Any]] = None
+    _fetched_at: float = 0.0  # 取得结果的时间（epoch 秒，需跨进程持久化）
+    _next_attempt: float = 0.0
+    _refresh_task: Optional[asyncio.Task] = None
+    _persisted_loaded: bool = False
+    _stats: Dict[str, int] = {
+        "fresh": 0,
+        "stale": 0,
+        "backoff": 0,
+        "refreshes": 0,
+        "failures": 0,
+    }
+
+    @classmethod
+    async def load_persisted(cls):
+        cls._persisted_loaded = True
+        try:
+            content = await asyncio.to_thread(_read_file, settings.MARKET_TREND_CACHE_PATH)
+        except Exception as e:
+            print(f"⚠️ Load market trend cache failed: {e}")
+            return
+        if content and content.get("data") and cls._data is None:
+            cls._data = content["data"]
+            cls._fetched_at = float(content.get("fetched_at", 0))
+
+    @classmethod
+    async def get_latest_trend(cls) -> Optional[Dict[str, Any]]:
+        if not cls._persisted_loaded:
+            await cls.load_persisted()
+
+        if cls._data is None:
+            # 上次调用失败后的重试间隔内直接返回失败，不再为每个请求调用 LLM
+            refreshing = cls._refresh_task is not None and not cls._refresh_task.done()
+            if not refreshing and time.monotonic() < cls._next_attempt:
+                cls._stats["backoff"] += 1
+                return None
+            # 没有任何可用结果时只能等待上游（并发请求共享同一次调用）
+            return await asyncio.shield(cls._ensure_refresh())
+
+        if time.time() - cls._fetched_at < settings.MARKET_TREND_TTL_SECONDS:
+            cls._stats["fresh"] += 1
+        else:
+            cls._stats["stale"] += 1
+            if time.monotonic() >= cls._next_attempt:
+                cls._ensure_refresh()
+        return cls._data
+
+    @classmethod
+    def _ensure_refresh(cls) -> asyncio.Task:
+        if cls._refresh_task is None or cls._refresh_task.done():
+            cls._refresh_task = asyncio.create_task(cls._refresh())
+        return cls._refresh_task
+
+    @classmethod
+    async def _refresh(cls) -> Optional[Dict[str, Any]]:
+        cls._stats["refreshes"] += 1
+        try:
+            result = await deepseek_client.call(MARKET_TREND_PROMPT, web_search=True)
+        except Exception as e:
+            result = None
+            print(f"⚠️ Refresh market trend failed: {e}")
+
+        if not result:
+            cls._stats["failures"] += 1
+            cls._next_attempt = time.monotonic() + RETRY_INTERVAL_SECONDS
+            return cls._data  # 保留上一次的有效结果
+
+        cls._data = result
+        cls._fetched_at = time.time()
+        try:
+            await asyncio.to_thread(
+                _write_file,
+                settings.MARKET_TREND_CACHE_PATH,
+                {"fetched_at": cls._fetched_at, "data": result},
+            )
+        except Exception as e:
+            print(f"⚠️ Persist market trend failed: {e}")
+        return result
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        return {
+            **cls._stats,
+            "age_seconds": round(time.time() - cls._fetched_at) if cls._data else None,
+            "refreshing": cls._refresh_task is not None and not cls._refresh_task.done(),
+        }
+
+
+metrics.register("market_trend", MarketTrendService.stats)
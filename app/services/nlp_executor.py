@@ -0,0 +1,186 @@
+# app/services/nlp_executor.py
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.utils import metrics
+
+WARMUP_TEXT = "浦东张江附近三房，预算800万左右，最好靠近地铁，学校好"
+
+
+def _init_worker(reload_data: bool = False):
+    """
+    工作进程初始化：加载 jieba 词典（含自定义词）、LocationMapper 与关键词自动机，
+    并各跑一次解析与权重推理，使首个真实请求不承担冷启动开销。
+    reload_data 为 True 时（fork 方式重建进程池）从磁盘重新加载数据，不沿用父进程中的旧数据。
+    """
+    from app.services.jieba_custom_dict import init_jieba
+    from app.services.nlp_parser_local import parse_text_sync
+    from app.services.weight_infer_local import infer_weights_sync
+
+    init_jieba()
+    if reload_data:
+        from app.services.data_reloader import apply_from_disk
+
+        apply_from_disk()
+    parse_text_sync(WARMUP_TEXT)
+    infer_weights_sync(WARMUP_TEXT)
+
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+class NLPExecutor:
+    """
+    本地 NLP 计算（jieba 分词、正则、关键词匹配）的执行器。
+    jieba 是纯 Python 实现，长文本会长时间占住事件循环；超过 inline_max_chars 的文本
+    提交到固定大小的线程池执行，短文本直接内联执行以省去调度开销。
+    processes > 0 时改用进程池，绕开 GIL，解析吞吐可随核数扩展；此时所有文本都交给工作进程，
+    不再内联（内联的短文本仍在事件循环所在进程执行，正是常见请求，进程池就起不到扩展作用）。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        inline_max_chars: int,
+        processes: int = 0,
+        start_method: str = "spawn",
+    ):
+        self.processes = max(0, processes)
+        self.workers = self.processes or max(1, workers)
+        self.inline_max_chars = inline_max_chars
+        self.start_method = start_method
+        self._executor: Optional[Executor] = None
+        # 以下计数只在事件循环线程内修改
+        self.inline = 0
+        self.offloaded = 0
+        self.pending = 0  # 已提交、尚未完成的任务数（执行中 + 排队中）
+        self.max_queue_depth = 0
+
+    @property
+    def mode(self) -> str:
+        return "process" if self.processes else "thread"
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.processes:
+            try:
+                self._executor = self._start_processes()
+                print(f"✅ NLP executor started ({self.processes} worker processes).")
+                return
+            except Exception as e:
+                print(f"⚠️ NLP worker processes failed to start, falling back to threads: {e}")
+                self.processes = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="nlp"
+        )
+        print(f"✅ NLP executor started ({self.workers} threads).")
+
+    def _start_processes(self, reload_data: bool = False) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(reload_data,),
+        )
+        try:
+            # 同时提交与进程数相同的空任务，促使工作进程在启动阶段创建并完成初始化；
+            # 初始化失败（如词典损坏）在这里暴露，而不是落到第一个请求上
+            futures = [executor.submit(_worker_pid) for _ in range(self.processes)]
+            wait(futures)
+            for f in futures:
+                f.result()
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor
+
+    async def prepare_restart(self) -> Optional[Executor]:
+        """
+        在线程中启动并初始化一组新的工作进程，返回新进程池但不替换当前进程池，
+        由调用方在替换主进程数据的同时调用 finish_restart；启动失败时抛出异常，当前进程池不受影响。
+        线程模式下与主进程共享数据，无需重建，返回 None。
+        """
+        if self.mode != "process" or self._executor is None:
+            return None
+        # fork 出的子进程继承父进程内存，此时主进程尚未替换数据，需在子进程中从磁盘重新加载
+        return await asyncio.to_thread(
+            self._start_processes, self.start_method == "fork"
+        )
+
+    def finish_restart(self, executor: Optional[Executor]):
+        """换上 prepare_restart 启动的进程池，旧进程池执行完已提交的任务后退出。"""
+        if executor is None:
+            return
+        old, self._executor = self._executor, executor
+        if old is not None:
+            old.shutdown(wait=False)
+        print(f"✅ NLP worker processes restarted ({self.processes} processes).")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            print("🛑 NLP executor stopped.")
+
+    async def run(self, func: Callable[..., Any], text: str, *args: Any) -> Any:
+        """
+        执行 func(text, *args)；线程模式下 text 不超过阈值时内联执行，否则在执行器中执行。
+        进程模式下 func 及其参数、返回值需可 pickle（模块级函数）。
+        """
+        if not self.processes and len(text) <= self.inline_max_chars:
+            self.inline += 1
+            return func(text, *args)
+
+        # 未经 lifespan 启动（如脚本中直接调用）时按需创建
+        if self._executor is None:
+            self.start()
+
+        self.offloaded += 1
+        self.pending += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, text, *args
+            )
+        finally:
+            self.pending -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """排队等待空闲 worker 的任务数。"""
+        return max(0, self.pending - self.workers)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "started": self._executor is not None,
+            "mode": self.mode,
+            "workers": self.workers,
+            "inline_max_chars": self.inline_max_chars,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "running": min(self.pending, self.workers),
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+# 单例
+nlp_executor = NLPExecutor(
+    settings.NLP_EXECUTOR_WORKERS,
+    settings.NLP_INLINE_MAX_CHARS,
+    processes=settings.NLP_WORKER_PROCESSES,
+    start_method=settings.NLP_WORKER_START_METHOD,
+)
+metrics.register("nlp_executor", nlp_executor.stats)
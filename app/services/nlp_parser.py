@@ -1,6 +1,6 @@
 from typing import List
 from app.services.location_mapper import mapper
-from app.services.deepseek_client import deepseek_client
+from app.services.llm_cache import llm_cache
 
 # Prompt: LLM 只解析预算、购房目的和其他偏好
 PROMPT_TEMPLATE = """
@@ -36,7 +36,7 @@ async def parse_text(text: str) -> dict:
 
     # 2. 构造 prompt 并调用 LLM
     prompt = PROMPT_TEMPLATE.replace("{text}", text.strip())
-    parsed_llm = await deepseek_client.call(prompt)
+    parsed_llm = await llm_cache.call(PROMPT_TEMPLATE, text, prompt)
     if not parsed_llm:
         return {}
 
@@ -1,81 +1,95 @@
 import re
-import jieba
 from typing import List, Dict, Any
 from app.services.location_mapper import mapper
-from app.config.keyword_config import (
-    PURPOSE_KEYWORDS,
-    FAMILY_STATUS_KEYWORDS,
-    PREFERENCE_KEYWORDS,
-    BEDROOM_MAP,
-)
+from app.services.keyword_matcher import keyword_matcher
+from app.services.nlp_executor import nlp_executor
+from app.config import keyword_config
 
 
-BEDROOM_PATTERNS = [
-    r"([一二两三四五六七八九])房",
-    r"([一二两三四五六七八九])室",
-    r"([一二两三四五六七八九])居",
-    r"(\d)房",
-    r"(\d)室",
-    r"(\d)居",
-]
+# 卧室数量：中文或阿拉伯数字 + 房/室/居，一次扫描
+BEDROOM_REGEX = re.compile(r"([一二两三四五六七八九\d])([房室居])")
+BEDROOM_UNITS = "房室居"
 
+# 按优先级排列的预算模式：(情况名, 模式)
 BUDGET_PATTERNS = [
     # 1. 数字 + 单位 + 区间（带"万"或"w"）+ 连接词：到、-、~、至
-    r"(?P<min>\d{2,4})\s*[万wW]?\s*(?:到|[-~—～至])\s*(?P<max>\d{2,4})\s*[万wW]?(?:之间|以内|左右)?",
+    ("range_wan", r"(?P<min>\d{2,4})\s*[万wW]?\s*(?:到|[-~—～至])\s*(?P<max>\d{2,4})\s*[万wW]?(?:之间|以内|左右)?"),
     # 2. 纯数字区间（如：5000000到8000000）
-    r"(?P<min>\d{5,8})\s*(?:到|[-~—～至])\s*(?P<max>\d{5,8})",
+    ("range_yuan", r"(?P<min>\d{5,8})\s*(?:到|[-~—～至])\s*(?P<max>\d{5,8})"),
     # 3. 单个预算值 + 后缀词（模糊）：预算在500万左右
-    r"(?:预算[是为在]?)?\s*(?P<value>\d{2,4})\s*[万wW]?\s*(?:左右|以内)?",
+    ("single_wan", r"(?P<value>\d{2,4})\s*[万wW]?\s*(?:左右|以内)?"),
     # 4. 单个大数字预算值（单位为元）
-    r"(?P<value>\d{6,8})(?![万wW])",
+    ("single_yuan", r"(?P<value>\d{6,8})(?![万wW])"),
 ]
 
+# 合并为一个交替模式，一次 finditer 得到所有候选，再按上面的优先级取第一个：
+# - 外层分组以情况名命名（match.lastgroup 即命中的情况），内层分组加情况名前缀；
+# - "预算是/为/在" 前缀对所有情况共用，避免单值模式从 "预算" 处起匹配而吞掉后面的区间；
+# - 开头的前瞻让不可能起匹配的位置（非数字、非"预"、非空白）直接跳过。
+BUDGET_REGEX = re.compile(
+    r"(?=[预\s\d])(?:预算[是为在]?)?\s*(?:"
+    + "|".join(
+        f"(?P<{case}>{pattern.replace('(?P<', f'(?P<{case}_')})"
+        for case, pattern in BUDGET_PATTERNS
+    )
+    + ")"
+)
+BUDGET_PRIORITY = {case: i for i, (case, _) in enumerate(BUDGET_PATTERNS)}
 
-def extract_budget(text: str) -> (int, int):
-    import re
-
-    for pattern in BUDGET_PATTERNS:
-        match = re.search(pattern, text)
-        if not match:
-            continue
-
-        group = match.groupdict()
-        if "min" in group and "max" in group:
-            min_val = int(group["min"])
-            max_val = int(group["max"])
-            # 单位判断：若为元则转换为万元
-            if min_val > 10000 and max_val > 10000:
-                min_val //= 10000
-                max_val //= 10000
-            return min_val, max_val
-
-        if "value" in group:
-            value = int(group["value"])
-            if value > 10000:
-                value //= 10000
-            delta = max(50, int(value * 0.1))  # 默认10%的浮动
-            return value - delta, value + delta
 
-    return None, None
+def extract_budget(text: str) -> (int, int):
+    best = None
+    for match in BUDGET_REGEX.finditer(text):
+        case = match.lastgroup
+        if best is None or BUDGET_PRIORITY[case] < BUDGET_PRIORITY[best.lastgroup]:
+            best = match
+            if BUDGET_PRIORITY[case] == 0:
+                break
+    if best is None:
+        return None, None
+
+    case = best.lastgroup
+    if case.startswith("range"):
+        min_val = int(best.group(f"{case}_min"))
+        max_val = int(best.group(f"{case}_max"))
+        # 单位判断：若为元则转换为万元
+        if min_val > 10000 and max_val > 10000:
+            min_val //= 10000
+            max_val //= 10000
+        return min_val, max_val
+
+    value = int(best.group(f"{case}_value"))
+    if value > 10000:
+        value //= 10000
+    delta = max(50, int(value * 0.1))  # 默认10%的浮动
+    return value - delta, value + delta
 
 
 def extract_bedroom_count(text: str) -> int:
-    for pattern in BEDROOM_PATTERNS:
-        assert isinstance(pattern, str), f"Pattern {pattern} is not a string"
-        match = re.search(pattern, text)
-        if match:
-            val = match.group(1)
-            if val in BEDROOM_MAP:
-                return BEDROOM_MAP[val]
-            elif val.isdigit():
-                return int(val)
-    return None
+    # 优先级：中文数字优先于阿拉伯数字，同类中 房 > 室 > 居，同级取最先出现的
+    best, best_rank = None, None
+    for match in BEDROOM_REGEX.finditer(text):
+        val, unit = match.groups()
+        rank = (3 if val.isdigit() else 0) + BEDROOM_UNITS.index(unit)
+        if best_rank is None or rank < best_rank:
+            best, best_rank = val, rank
+            if rank == 0:
+                break
+    if best is None:
+        return None
+    if best in keyword_config.BEDROOM_MAP:
+        return keyword_config.BEDROOM_MAP[best]
+    return int(best)
 
 
 # -------------------- 主函数 --------------------
 async def parse_text(text: str) -> Dict[str, Any]:
+    """解析购房需求文本；长文本在 NLP 执行器中执行，不阻塞事件循环。"""
+    return await nlp_executor.run(parse_text_sync, text)
+
+
+def parse_text_sync(text: str) -> Dict[str, Any]:
     text = text.strip()
-    words = list(jieba.cut(text))
 
     # 1. 地名提取（区、板块名）
     district_names, circle_names = mapper.extract(text)
@@ -101,14 +115,11 @@ async def parse_text(text: str) -> Dict[str, Any]:
     # 3. 卧室数量提取（支持中文/数字/居/房/室）
     bedroom_count = extract_bedroom_count(text)
 
-    # 4. 购房目的提取
-    purpose = [k for k, v in PURPOSE_KEYWORDS.items() if any(word in text for word in v)] or None
-
-    # 5. 家庭状况提取
-    family_status = [k for k, v in FAMILY_STATUS_KEYWORDS.items() if any(word in text for word in v)] or None
-
-    # 6. 偏好提取
-    preferences = [k for k, v in PREFERENCE_KEYWORDS.items() if any(word in text for word in v)] or None
+    # 4~6. 购房目的、家庭状况、偏好：关键词自动机一次扫描得到全部类别
+    matched = keyword_matcher.match(text)
+    purpose = matched["purpose"] or None
+    family_status = matched["family_status"] or None
+    preferences = matched["preference"] or None
 
     # 7. 构造返回结构
     return {
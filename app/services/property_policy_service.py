@@ -1,10 +1,23 @@
 import json
 from app.db import Database
+from app.core.config import settings
+from app.utils.cache import AsyncCache
+
+# 政策数据每天至多更新一次，缓存最新一条
+_cache = AsyncCache(
+    settings.READ_CACHE_TTL_SECONDS, max_entries=1, name="property_policy"
+)
 
 
 class PropertyPolicyService:
     @staticmethod
     async def get_latest_policy():
+        return await _cache.get_or_load(
+            "latest", PropertyPolicyService._fetch_latest_policy
+        )
+
+    @staticmethod
+    async def _fetch_latest_policy():
         sql = """
         SELECT id, policy_date, policy_data, data_source, created_at, updated_at
         FROM public.sh_property_policies
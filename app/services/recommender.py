@@ -1,125 +1,261 @@
 # app/services/recommender.py
 
-from typing import Dict, List, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from app.db import Database
 from app.utils.sql_utils import format_sql
 from app.models.requirement import ParsedRequirement
 from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.services.community_score_engine import community_score_engine, SCORE_KEYS
+from app.services.location_mapper import mapper
 
 MAX_INT = 2147483647
 
+# 参数位置固定：$1~$7 权重, $8 随机因子, $9 随机种子（可为 NULL）, $10 limit, 其后为价格条件，
+# 指定区域时最后是区域参数（见 region_params）
+_SELECT_SCORED = """
+SELECT v.id, v.name, v.district_name, v.circle_name, v.avg_listing_price,
+       v.base_score, v.living_score, v.traffic_score, v.school_score,
+       v.hospital_score, v.park_score, v.restaurant_score,
+       (
+           ROUND(
+               v.base_score * CAST($1 AS NUMERIC) +
+               v.living_score * CAST($2 AS NUMERIC) +
+               v.traffic_score * CAST($3 AS NUMERIC) +
+               v.school_score * CAST($4 AS NUMERIC) +
+               v.hospital_score * CAST($5 AS NUMERIC) +
+               v.park_score * CAST($6 AS NUMERIC) +
+               v.restaurant_score * CAST($7 AS NUMERIC)
+           , 2)
+           + (
+               CASE WHEN $9::text IS NULL THEN RANDOM()
+                    -- 指定 seed 时扰动由 (seed, id) 决定，结果可复现、可缓存
+                    ELSE ('x' || substr(md5($9 || ':' || v.id::text), 1, 8))::bit(32)::bigint
+                         / 4294967295.0
+               END * CAST($8 AS DOUBLE PRECISION)
+           )  -- 随机因子，最大扰动由参数控制
+       ) AS final_score
+FROM public.v_community_scores v
+"""
+
+
+# 区域过滤的三种固定形态（见 region_variant）。不用 ($n IS NULL OR ...) 这类兼容多种情况的写法，
+# 否则通用计划无法按板块走索引
+REGION_VARIANTS = ("all", "circles", "districts")
+
+
+def region_variant(region: Optional[tuple]) -> str:
+    """
+    region 为 mapper.resolve_region 的结果：None 不限区域（"all"）；只指定板块时只按板块过滤
+    （"circles"）；含区时另外按小区自身的区编码匹配 circle.csv 未收录的板块（"districts"）。
+    """
+    if region is None:
+        return "all"
+    return "districts" if region[1] else "circles"
+
+
+def region_filter(variant: str, first_param: int) -> str:
+    """区域过滤条件（含前导 AND），参数从 $first_param 开始，顺序与 region_params 一致。"""
+    if variant == "all":
+        return ""
+    if variant == "circles":
+        return f"\n  AND v.circle_code = ANY(${first_param})"
+    return (
+        f"\n  AND (v.circle_code = ANY(${first_param})"
+        f"\n       OR (v.district_code = ANY(${first_param + 1})"
+        f"\n           AND (v.circle_code = ANY(${first_param + 2})) IS NOT TRUE))"
+    )
+
+
+def region_params(region: Optional[tuple]) -> list:
+    """区域参数：板块编码数组；含区时再加区编码数组与 circle.csv 收录的全部板块编码。"""
+    if region is None:
+        return []
+    circles, districts = region
+    if not districts:
+        return [list(circles)]
+    return [list(circles), list(districts), list(mapper.known_circle_codes())]
+
+
+def _ranking_sql(join: str, price_filter: str, variant: str, region_param: int) -> str:
+    where = price_filter + region_filter(variant, region_param)
+    return f"{_SELECT_SCORED}{join}\nWHERE {where}\nORDER BY final_score DESC\nLIMIT $10\n"
+
+
+_JOIN_ROOMTYPE = "JOIN public.mv_community_roomtype_avg_price p ON v.id = p.community_id"
+_FILTER_ROOMTYPE = "p.room_type = $11\n  AND p.avg_price BETWEEN $12 AND $13"
+_JOIN_RANGE = "JOIN public.v_community_price_range r ON v.id = r.community_id"
+_FILTER_RANGE = "NOT (r.max_avg_price < $11 OR r.min_avg_price > $12)"
+
+# (按房型, 区域形态) -> (语句名, SQL)
+_STATEMENTS = {}
+for _variant in REGION_VARIANTS:
+    _suffix = "" if _variant == "all" else f"_in_{_variant}"
+    _STATEMENTS[(True, _variant)] = (
+        f"recommend_communities_by_roomtype{_suffix}",
+        _ranking_sql(_JOIN_ROOMTYPE, _FILTER_ROOMTYPE, _variant, 14),
+    )
+    _STATEMENTS[(False, _variant)] = (
+        f"recommend_communities_by_range{_suffix}",
+        _ranking_sql(_JOIN_RANGE, _FILTER_RANGE, _variant, 13),
+    )
+for _name, _sql in _STATEMENTS.values():
+    Database.register_statement(_name, _sql)
+
+# 带 seed 的请求结果可复现，按规范化后的查询条件缓存
+_result_cache = TTLCache(
+    settings.RECOMMEND_CACHE_TTL_SECONDS,
+    settings.RECOMMEND_CACHE_MAX_ENTRIES,
+    name="recommend_communities",
+)
+
+
+def _filter_args(requirement: ParsedRequirement) -> tuple:
+    """把结构化需求转换为 (region, bedroom_count, min_price, max_price)。"""
+    budget_range = requirement.budget or [None, None]
+    min_price = (budget_range[0] or 0) * 10000
+    max_price = budget_range[1] * 10000 if budget_range[1] else MAX_INT
+    return (
+        mapper.resolve_region(requirement.district_codes, requirement.circle_codes),
+        requirement.bedroom_count,
+        min_price,
+        max_price,
+    )
+
+
+def _build_query(
+    requirement: ParsedRequirement,
+    weights: Optional[Dict[str, float]] = None,
+    limit: int = 10,
+    random_factor: float = 1.0,
+    seed: Optional[str] = None,
+) -> tuple:
+    """
+    规范化为排序查询元组：
+    (region, bedroom_count, min_price, max_price, weights, limit, random_factor, seed)
+    region 为归一化后的 (板块编码, 区编码) 元组，None 表示不限区域。
+    """
+    if not requirement:
+        raise ValueError("Requirement must be provided")
+    return (
+        *_filter_args(requirement),
+        weights or settings.DEFAULT_WEIGHTS,
+        limit,
+        random_factor,
+        seed,
+    )
+
+
+def _cache_key(query: tuple) -> Optional[tuple]:
+    """只有带 seed 的查询结果是确定的，才可以缓存；与排序无关的需求字段不参与 key。"""
+    region, bedroom, lo, hi, weights, limit, random_factor, seed = query
+    if seed is None:
+        return None
+    return (
+        region,
+        bedroom,
+        lo,
+        hi,
+        tuple(weights[k] for k in SCORE_KEYS),
+        limit,
+        random_factor,
+        seed,
+    )
+
 
 class RecommenderService:
     def __init__(self):
         self.db = Database
 
+    async def recommend_communities_batch(
+        self, items: List[Dict[str, Any]]
+    ) -> List[List[Dict]]:
+        """
+        批量推荐小区。items 中每一项为 recommend_communities 的关键字参数
+        （requirement / weights / limit / random_factor / seed）。
+        内存评分引擎可用时在线程中按过滤条件分组、分块矩阵乘法完成排序；否则逐条走 SQL。
+        """
+        queries = [_build_query(**item) for item in items]
+        keys = [_cache_key(q) for q in queries]
+        results: List[Optional[List[Dict]]] = [
+            _result_cache.get(k) if k is not None else None for k in keys
+        ]
+        pending = [i for i, r in enumerate(results) if r is None]
+
+        if community_score_engine.ready:
+            ranked = await asyncio.to_thread(
+                community_score_engine.recommend_batch, [queries[i] for i in pending]
+            )
+        else:
+            ranked = [await self._recommend_sql(queries[i]) for i in pending]
+
+        for i, rows in zip(pending, ranked):
+            results[i] = rows
+            if keys[i] is not None:
+                _result_cache.set(keys[i], rows)
+        return results
+
     async def recommend_communities(
         self,
         requirement: ParsedRequirement,
         weights: Optional[Dict[str, float]] = None,
         limit: int = 10,
         random_factor: float = 1.0,  # 新增参数，默认1.0
+        seed: Optional[str] = None,
     ) -> List[Dict]:
-        if not requirement:
-            raise ValueError("Requirement must be provided")
-        score_weights = weights or settings.DEFAULT_WEIGHTS
-
-        district_codes = requirement.district_codes or []
-        circle_codes = requirement.circle_codes or []
-        budget_range = requirement.budget or [None, None]
-        bedroom_count = requirement.bedroom_count
-
-        min_price = (budget_range[0] or 0) * 10000
-        max_price = budget_range[1] * 10000 if budget_range[1] else MAX_INT
-
-        # 动态拼接 WHERE 条件
-        where_clauses = []
-        params = []
-        param_idx = 1
-
-        if district_codes and len(district_codes) > 0:
-            where_clauses.append(f"v.district_code = ANY(${param_idx})")
-            params.append(district_codes)
-            param_idx += 1
-        if circle_codes and len(circle_codes) > 0:
-            where_clauses.append(f"v.circle_code = ANY(${param_idx})")
-            params.append(circle_codes)
-            param_idx += 1
-
-        if not where_clauses:
-            where_sql = "TRUE"
+        query = _build_query(requirement, weights, limit, random_factor, seed)
+        key = _cache_key(query)
+        if key is not None:
+            cached = _result_cache.get(key)
+            if cached is not None:
+                return cached
+
+        # 内存评分引擎已加载时直接在进程内排序，否则回退到 SQL
+        if community_score_engine.ready:
+            ranked = await asyncio.to_thread(community_score_engine.recommend_batch, [query])
+            rows = ranked[0]
         else:
-            where_sql = " OR ".join(where_clauses)
-
-        # 记录 limit 参数在 params 中的位置
-        limit_idx = param_idx
-        params.append(limit)
-        param_idx += 1
-
-        # 其余参数
-        params += [
-            score_weights["base_score"],
-            score_weights["living_score"],
-            score_weights["traffic_score"],
-            score_weights["school_score"],
-            score_weights["hospital_score"],
-            score_weights["park_score"],
-            score_weights["restaurant_score"],
+            rows = await self._recommend_sql(query)
+
+        if key is not None:
+            _result_cache.set(key, rows)
+        return rows
+
+    async def _recommend_sql(self, query: tuple) -> List[Dict]:
+        (
+            region,
+            bedroom_count,
+            min_price,
+            max_price,
+            score_weights,
+            limit,
+            random_factor,
+            seed,
+        ) = query
+
+        # 固定文本的语句：按区域形态选用各自的语句，随机因子和种子作为绑定参数
+        params = [
+            *(score_weights[k] for k in SCORE_KEYS),
+            random_factor,
+            seed,
+            limit,
         ]
         if bedroom_count is not None:
             params += [bedroom_count, min_price, max_price]
-            query = f"""
-            SELECT v.id, v.name, v.district_name, v.circle_name, v.avg_listing_price,
-                   v.base_score, v.living_score, v.traffic_score, v.school_score,
-                   v.hospital_score, v.park_score, v.restaurant_score,
-                   (
-                       ROUND(
-                           v.base_score * CAST(${param_idx} AS NUMERIC) +
-                           v.living_score * CAST(${param_idx+1} AS NUMERIC) +
-                           v.traffic_score * CAST(${param_idx+2} AS NUMERIC) +
-                           v.school_score * CAST(${param_idx+3} AS NUMERIC) +
-                           v.hospital_score * CAST(${param_idx+4} AS NUMERIC) +
-                           v.park_score * CAST(${param_idx+5} AS NUMERIC) +
-                           v.restaurant_score * CAST(${param_idx+6} AS NUMERIC)
-                       , 2)
-                       + (RANDOM() * {random_factor})  -- 随机因子，最大扰动由参数控制
-                   ) AS final_score
-            FROM public.v_community_scores v
-            JOIN public.mv_community_roomtype_avg_price p ON v.id = p.community_id
-            WHERE {where_sql}
-              AND p.room_type = ${param_idx+7}
-              AND p.avg_price BETWEEN ${param_idx+8} AND ${param_idx+9}
-            ORDER BY final_score DESC
-            LIMIT ${limit_idx}
-            """
         else:
             params += [min_price, max_price]
-            query = f"""
-            SELECT v.id, v.name, v.district_name, v.circle_name, v.avg_listing_price,
-                   v.base_score, v.living_score, v.traffic_score, v.school_score,
-                   v.hospital_score, v.park_score, v.restaurant_score,
-                   (
-                       ROUND(
-                           v.base_score * CAST(${param_idx} AS NUMERIC) +
-                           v.living_score * CAST(${param_idx+1} AS NUMERIC) +
-                           v.traffic_score * CAST(${param_idx+2} AS NUMERIC) +
-                           v.school_score * CAST(${param_idx+3} AS NUMERIC) +
-                           v.hospital_score * CAST(${param_idx+4} AS NUMERIC) +
-                           v.park_score * CAST(${param_idx+5} AS NUMERIC) +
-                           v.restaurant_score * CAST(${param_idx+6} AS NUMERIC)
-                       , 2)
-                       + (RANDOM() * {random_factor})  -- 随机因子，最大扰动由参数控制
-                   ) AS final_score
-            FROM public.v_community_scores v
-            JOIN public.v_community_price_range r ON v.id = r.community_id
-            WHERE {where_sql}
-              AND NOT (r.max_avg_price < ${param_idx+7} OR r.min_avg_price > ${param_idx+8})
-            ORDER BY final_score DESC
-            LIMIT ${limit_idx}
-            """
+        params += region_params(region)
+        name, sql = _STATEMENTS[(bedroom_count is not None, region_variant(region))]
+
         print("💡", "-" * 80)
-        print(format_sql(query, params))
+        print(format_sql(sql, params))
         print("💡", "-" * 80)
 
-        rows = await self.db.fetch_all(query, params)
+        rows = await self.db.fetch_prepared(
+            name,
+            params,
+            timeout=settings.DB_RANKING_TIMEOUT_SECONDS,
+            work_mem=settings.DB_RANKING_WORK_MEM or None,
+        )
         return [dict(row) for row in rows]
@@ -0,0 +1,13 @@
+from functools import lru_cache
+from typing import Tuple
+
+import jieba
+
+
+@lru_cache(maxsize=1024)
+def segment(text: str) -> Tuple[str, ...]:
+    """
+    jieba 精确模式分词。只有真正需要分词结果的调用方（如权重推理）才调用；
+    同一文本在一次请求中被多个环节使用时，只分词一次。
+    """
+    return tuple(jieba.cut(text))
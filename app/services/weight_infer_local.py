@@ -1,11 +1,65 @@
-import jieba
 import numpy as np
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from app.config.keyword_config import WEIGHT_KEYWORDS
+from app.services.nlp_executor import nlp_executor
+from app.services.segmenter import segment
 
 DEFAULT_BASE_SCORE = 0.2  # 没匹配到关键词时的默认基础得分
 
 
+def build_keyword_index(
+    weight_keywords: Dict[str, List[str]],
+) -> Tuple[Tuple[str, ...], Dict[str, Tuple[int, ...]]]:
+    """
+    构建倒排索引：词 -> 命中的评分项下标。
+    同一个词可以属于多个评分项；同一评分项内的重复词只计一次，与逐项 `word in keywords` 一致。
+    :return: (评分项名称顺序, 倒排索引)
+    """
+    score_keys = tuple(weight_keywords)
+    index: Dict[str, List[int]] = {}
+    for i, keywords in enumerate(weight_keywords.values()):
+        for word in dict.fromkeys(keywords):
+            index.setdefault(word, []).append(i)
+    return score_keys, {word: tuple(ids) for word, ids in index.items()}
+
+
+SCORE_KEYS, KEYWORD_INDEX = build_keyword_index(WEIGHT_KEYWORDS)
+
+
+def rebuild_keyword_index(
+    weight_keywords: Dict[str, List[str]],
+) -> Dict[str, Tuple[int, ...]]:
+    """
+    用新的关键词配置重建倒排索引（不替换当前索引）。评分项对应数据库评分列，不能随配置变化，
+    顺序或名称不一致时抛出 ValueError。
+    """
+    score_keys, index = build_keyword_index(weight_keywords)
+    if score_keys != SCORE_KEYS:
+        raise ValueError(f"WEIGHT_KEYWORDS 评分项不一致: {score_keys} != {SCORE_KEYS}")
+    return index
+
+
+def swap_keyword_index(index: Dict[str, Tuple[int, ...]]):
+    global KEYWORD_INDEX
+    KEYWORD_INDEX = index
+
+
+def _keyword_hits(words: Iterable[str]) -> List[int]:
+    return [i for word in words for i in KEYWORD_INDEX.get(word, ())]
+
+
+def stretch_array(values: np.ndarray, alpha: float = 1) -> np.ndarray:
+    """对最后一维做幂次拉伸并重新归一化，支持单条 (7,) 或批量 (N, 7)。"""
+    stretched = np.power(values, alpha)
+    return stretched / stretched.sum(axis=-1, keepdims=True)
+
+
+def weights_from_counts(counts: np.ndarray, alpha: float = 1) -> np.ndarray:
+    """关键词命中次数 -> 归一化并拉伸后的权重，未命中的评分项按 DEFAULT_BASE_SCORE 计。"""
+    raw = np.where(counts > 0, counts, DEFAULT_BASE_SCORE)
+    return stretch_array(raw / raw.sum(axis=-1, keepdims=True), alpha)
+
+
 def stretch_weights(weights: Dict[str, float], alpha: float = 1) -> Dict[str, float]:
     """
     对权重进行拉伸处理，使主项更突出，次项更低调
@@ -14,32 +68,57 @@ def stretch_weights(weights: Dict[str, float], alpha: float = 1) -> Dict[str, fl
     :return: 拉伸后的归一化权重（保留3位小数）
     """
     keys = list(weights.keys())
-    values = np.array([weights[k] for k in keys])
-    stretched = np.power(values, alpha)
-    normalized = stretched / stretched.sum()
+    normalized = stretch_array(np.array([weights[k] for k in keys], dtype=np.float64), alpha)
     return {k: round(float(v), 3) for k, v in zip(keys, normalized)}
 
 
 async def infer_weights_locally(
-    requirement_text: str, alpha: float = 1
+    requirement_text: str, alpha: float = 1, words: Optional[Sequence[str]] = None
 ) -> Dict[str, float]:
     """
     根据用户需求文本，使用分词和关键词匹配进行评分项权重推理（本地）
+    长文本的分词与计算在 NLP 执行器中执行，不阻塞事件循环。
     :param requirement_text: 用户购房需求文本
+    :param words: 已有的分词结果（同一请求内共享时传入），为空时自行分词
     :return: 各项评分权重（总和为1）
     """
-    words = list(jieba.cut(requirement_text))  # 精确模式分词
-    raw_scores = {}
+    return await nlp_executor.run(infer_weights_sync, requirement_text, alpha, words)
+
 
-    for score_key, keywords in WEIGHT_KEYWORDS.items():
-        matched = sum(1 for word in words if word in keywords)
-        raw_scores[score_key] = matched if matched > 0 else DEFAULT_BASE_SCORE
+def infer_weights_sync(
+    requirement_text: str, alpha: float = 1, words: Optional[Sequence[str]] = None
+) -> Dict[str, float]:
+    """infer_weights_locally 的同步实现。"""
+    if words is None:
+        words = segment(requirement_text)  # 精确模式分词
+    hits = np.array(_keyword_hits(words), dtype=np.intp)
+    counts = np.bincount(hits, minlength=len(SCORE_KEYS))
+    weights = weights_from_counts(counts, alpha)
+    return {k: round(float(v), 3) for k, v in zip(SCORE_KEYS, weights)}
 
-    total_score = sum(raw_scores.values())
-    normalized_scores = {k: v / total_score for k, v in raw_scores.items()}
 
-    # return normalized_scores
-    return stretch_weights(normalized_scores, alpha)
+def infer_weights_batch(
+    texts: Sequence[str],
+    alpha: float = 1,
+    words_list: Optional[Sequence[Sequence[str]]] = None,
+) -> np.ndarray:
+    """
+    批量权重推理，用于离线处理历史线索文本。
+    :param texts: 需求文本列表
+    :param words_list: 与 texts 一一对应的已有分词结果，为空时自行分词
+    :return: N×7 权重矩阵，列顺序为 SCORE_KEYS，保留3位小数
+    """
+    if words_list is None:
+        words_list = [segment(text) for text in texts]
+    k = len(SCORE_KEYS)
+    flat: List[int] = []
+    for row, words in enumerate(words_list):
+        offset = row * k
+        flat.extend(offset + i for i in _keyword_hits(words))
+    counts = np.bincount(
+        np.array(flat, dtype=np.intp), minlength=len(words_list) * k
+    ).reshape(len(words_list), k)
+    return np.round(weights_from_counts(counts, alpha), 3)
 
 
 # ✅ 示例调用
@@ -2,7 +2,7 @@ import numpy as np
 
 from typing import Dict
 from app.core.config import settings
-from app.services.deepseek_client import deepseek_client
+from app.services.llm_cache import llm_cache
 
 # 优化后的 Prompt
 WEIGHT_INFER_PROMPT = """
@@ -57,7 +57,7 @@ class WeightInferencer:
         self, requirement_text: str, alpha: float = 2.0
     ) -> Dict[str, float]:
         prompt = WEIGHT_INFER_PROMPT.format(requirement=requirement_text)
-        result = await deepseek_client.call(prompt)
+        result = await llm_cache.call(WEIGHT_INFER_PROMPT, requirement_text, prompt)
 
         # 默认权重作为 fallback
         default_weights = settings.DEFAULT_WEIGHTS
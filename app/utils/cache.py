@@ -0,0 +1,177 @@
+# app/utils/cache.py
+
+import asyncio
+import pickle
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.utils import metrics
+
+_MISSING = object()
+
+# 所有具名缓存，供指标汇总与统一失效使用
+_registry: Dict[str, "TTLCache"] = {}
+
+
+def _estimate_size(value: Any) -> int:
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class TTLCache:
+    """
+    进程内的 TTL + LRU 缓存（非线程安全，供事件循环内使用）。
+    超过 max_entries 条或 max_bytes 字节（按 pickle 长度估算）时淘汰最久未访问的条目。
+    传入 name 时注册到全局，可通过 /api/metrics 查看命中率、通过 invalidate_cache 统一失效。
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        name: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        # key -> (过期时间, 值, 估算字节数)
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name:
+            _registry[name] = self
+
+    def _lookup(self, key: Hashable) -> Any:
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return _MISSING
+        expires_at, value, _size = item
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return _MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        size = _estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return  # 单条超过上限，不缓存
+        self._remove(key)
+        self._data[key] = (
+            time.monotonic() + (self.ttl if ttl is None else ttl),
+            value,
+            size,
+        )
+        self._bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            old_key = next(iter(self._data))
+            self._remove(old_key)
+            self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[2]
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """不传 key 时清空全部缓存。"""
+        if key is _MISSING:
+            self._data.clear()
+            self._bytes = 0
+        else:
+            self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AsyncCache(TTLCache):
+    """
+    在 TTLCache 基础上增加 single-flight：同一 key 并发未命中时只执行一次 loader，
+    其余请求等待同一个结果。loader 抛出的异常会传给所有等待者且不会被缓存。
+    loader 在独立的 task 中执行，某个调用方被取消（如客户端断开）不影响其他等待者，
+    也不会中断加载，结果照常写入缓存。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+    ) -> Any:
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(self._load(key, loader, ttl))
+            # 所有调用方都已取消时没有人读取异常，避免 "exception was never retrieved" 警告
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float]
+    ) -> Any:
+        try:
+            value = await loader()
+            self.set(key, value, ttl)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "coalesced": self.coalesced, "inflight": len(self._inflight)}
+
+
+def invalidate_cache(name: Optional[str] = None, key: Hashable = _MISSING) -> list:
+    """失效指定名称的缓存（不传 name 时失效全部），返回被处理的缓存名称。"""
+    names = [name] if name else list(_registry)
+    for n in names:
+        cache = _registry.get(n)
+        if cache is not None:
+            cache.invalidate(key)
+    return [n for n in names if n in _registry]
+
+
+def cache_stats() -> Dict[str, Any]:
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+metrics.register("caches", cache_stats)
@@ -0,0 +1,69 @@
+# app/utils/json_response.py
+
+import json
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+def _make_default(decimal: Callable[[Decimal], Any]) -> Callable[[Any], Any]:
+    def default(obj: Any) -> Any:
+        if isinstance(obj, Decimal):
+            return decimal(obj)
+        if hasattr(obj, "isoformat"):
+            return obj.isoformat()
+        if hasattr(obj, "tolist"):  # numpy 标量/数组
+            return obj.tolist()
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+    return default
+
+
+_DEFAULTS = {float: _make_default(float), str: _make_default(str)}
+
+
+def dumps(content: Any, decimal: Callable[[Decimal], Any] = float) -> bytes:
+    """与 FastJSONResponse 相同的序列化（orjson 可用时使用），供流式接口逐行编码。"""
+    default = _DEFAULTS[decimal]
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content, default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    用 orjson（可用时）直接序列化 dict/list，支持 Decimal、datetime 与 numpy 类型。
+    decimal 决定 Decimal 的输出形式：float 字段用 float，未声明类型的 Dict 与 pydantic 一致用 str。
+    """
+
+    def __init__(self, content: Any, decimal: Callable[[Decimal], Any] = float, **kwargs):
+        self._decimal = decimal
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content, decimal=self._decimal)
+
+
+def fast_json(content: Any, decimal: Callable[[Decimal], Any] = float) -> Any:
+    """
+    开启 FAST_JSON_RESPONSE 时把服务层结果直接包装成 FastJSONResponse 返回：
+    FastAPI 遇到 Response 实例不再按 response_model 校验和编码（response_model 仍用于文档）。
+    只用于字段已与 response_model 一致的可信服务层输出；关闭时原样返回，走常规路径。
+    """
+    if settings.FAST_JSON_RESPONSE:
+        return FastJSONResponse(content, decimal=decimal)
+    return content
@@ -0,0 +1,21 @@
+# app/utils/metrics.py
+
+from typing import Any, Callable, Dict
+
+# 各模块注册的指标提供函数：name -> 返回当前指标字典的函数
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register(name: str, provider: Callable[[], Dict[str, Any]]):
+    """注册一组运行时指标，/api/metrics 会在请求时调用 provider 获取最新值。"""
+    _providers[name] = provider
+
+
+def snapshot() -> Dict[str, Any]:
+    result = {}
+    for name, provider in _providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            result[name] = {"error": str(e)}
+    return result
@@ -0,0 +1,25 @@
+# app/utils/periodic.py
+
+import asyncio
+from typing import Awaitable, Callable
+
+
+def run_periodically(
+    interval: float, func: Callable[[], Awaitable[None]], name: str
+) -> asyncio.Task:
+    """
+    启动一个后台任务，每隔 interval 秒执行一次 func。
+    单次执行失败只打印日志，不会中断后续调度；应用关闭时 cancel 返回的 task 即可。
+    """
+
+    async def _loop():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ 定时任务 {name} 执行失败: {e}")
+
+    return asyncio.create_task(_loop(), name=name)
@@ -0,0 +1,93 @@
+"""
+DeepSeekClient 对本地桩服务的压测：桩服务模拟固定延迟的 chat/completions 接口，
+并发发起调用，统计耗时、服务端看到的 TCP 连接数与最大并发，并校验：
+- 同时在途的请求数不超过 DEEPSEEK_MAX_CONCURRENCY；
+- 等待信号量期间被取消的调用不会让 waiting 计数残留。
+不访问外网，不需要 API Key。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_deepseek_client
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+from app.core.config import settings
+from app.services.deepseek_client import DeepSeekClient
+
+CALLS = 40
+LATENCY_SECONDS = 0.05
+
+stub = FastAPI()
+peers = set()
+active = 0
+max_active = 0
+
+
+@stub.post("/chat/completions")
+async def chat(request: Request):
+    global active, max_active
+    peers.add((request.client.host, request.client.port))
+    active += 1
+    max_active = max(max_active, active)
+    try:
+        await asyncio.sleep(LATENCY_SECONDS)
+    finally:
+        active -= 1
+    content = json.dumps({"district_names": ["浦东"], "budget": [500, 800]}, ensure_ascii=False)
+    return {"choices": [{"message": {"content": f"结果如下：{content}"}}]}
+
+
+def start_stub() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/chat/completions"
+
+
+async def main():
+    client = DeepSeekClient()
+    client.api_url = start_stub()
+    await client.start()
+    try:
+        await client.call("warmup")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client.call(f"q{i}") for i in range(CALLS)))
+        elapsed = time.perf_counter() - start
+        assert all(r == {"district_names": ["浦东"], "budget": [500, 800]} for r in results)
+        print(
+            f"{CALLS} calls  {elapsed * 1000:8.1f} ms  "
+            f"connections={len(peers)}  max_concurrency_seen={max_active}"
+        )
+        assert max_active <= settings.DEEPSEEK_MAX_CONCURRENCY
+
+        # 占满信号量后再发起调用并在等待中取消，waiting 应回到 0
+        tasks = [
+            asyncio.create_task(client.call(f"c{i}"))
+            for i in range(settings.DEEPSEEK_MAX_CONCURRENCY * 2)
+        ]
+        await asyncio.sleep(LATENCY_SECONDS / 5)
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        print("after cancel:", client.stats())
+        assert client.waiting == 0 and client.in_flight == 0
+    finally:
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""
+接口序列化路径的基准：同一份服务层结果分别走常规路径（response_model 校验 + 标准库编码）
+与 FAST_JSON_RESPONSE 路径（FastJSONResponse 直接序列化），比较端到端耗时并校验输出一致。
+服务层方法替换为返回固定数据，不需要数据库。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_json_response
+"""
+
+import datetime
+import json
+import random
+import time
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import circle_score, community_score, recommendation
+from app.core.config import settings
+from app.services.circle_recommender import CircleRecommenderService
+from app.services.community_score_service import PRICE_COLUMNS, SCORE_COLUMNS
+from app.services.recommender import RecommenderService
+from app.utils.json_response import orjson
+
+rng = random.Random(0)
+
+
+def community_detail(i):
+    row = {k: round(rng.random() * 100, 2) for k in SCORE_COLUMNS + PRICE_COLUMNS}
+    row.update(
+        id=str(i),
+        community_id=str(i),
+        name=f"小区{i}",
+        alias=None,
+        created_at=datetime.datetime(2024, 1, 1, 8, 30),
+        updated_at=datetime.datetime(2024, 6, 1, 8, 30),
+        latest_month=datetime.date(2024, 6, 1),
+        mom_ratio=Decimal("0.0123"),
+    )
+    return row
+
+
+def community_top(i):
+    return {
+        "id": str(i),
+        "name": f"小区{i}",
+        "district_name": "浦东",
+        "circle_name": "张江",
+        **{k: round(rng.random() * 100, 2) for k in (
+            "base_score", "living_score", "traffic_score", "school_score",
+            "hospital_score", "park_score", "restaurant_score",
+        )},
+        "avg_listing_price": Decimal("85000.00"),
+        "final_score": Decimal("73.21"),
+    }
+
+
+def circle_top(i):
+    return {
+        "circle_code": str(i),
+        "circle_name": f"板块{i}",
+        "district_name": "浦东",
+        "avg_list_price": Decimal("85000.00"),
+        "avg_sign_price": Decimal("80000.00"),
+        "transaction_count": 12,
+        "community_count": 40,
+        **{f"avg_{k}_score": round(rng.random() * 100, 2) for k in (
+            "base", "living", "traffic", "school", "hospital", "park", "restaurant",
+        )},
+        "final_score": Decimal("70.5"),
+    }
+
+
+DETAILS = [community_detail(i) for i in range(500)]
+TOP_COMMUNITIES = [community_top(i) for i in range(10)]
+TOP_CIRCLES = [circle_top(i) for i in range(10)]
+
+
+async def _scores(self, ids):
+    return DETAILS[: len(ids)]
+
+
+async def _recommend(self, *args, **kwargs):
+    return TOP_COMMUNITIES
+
+
+async def _recommend_circles(self, *args, **kwargs):
+    return TOP_CIRCLES
+
+
+async def _recommend_batch(self, items):
+    return [TOP_COMMUNITIES for _ in items]
+
+
+community_score.community_score_service.get_communities_scores = _scores.__get__(
+    community_score.community_score_service
+)
+circle_score.circle_score_service.get_circles_scores = _scores.__get__(
+    circle_score.circle_score_service
+)
+RecommenderService.recommend_communities = _recommend
+RecommenderService.recommend_communities_batch = _recommend_batch
+CircleRecommenderService.recommend_circles = _recommend_circles
+
+REQUIREMENT = {"parsed_requirement": {"region": "浦东"}, "seed": "s"}
+CASES = [
+    ("community-scores x50", "/api/community-scores", {"community_ids": [str(i) for i in range(50)]}),
+    ("community-scores x500", "/api/community-scores", {"community_ids": [str(i) for i in range(500)]}),
+    ("circle-scores x50", "/api/circle-scores", {"circle_codes": [str(i) for i in range(50)]}),
+    ("recommend-communities", "/api/recommend-communities", REQUIREMENT),
+    ("recommend-circles", "/api/recommend-circles", REQUIREMENT),
+    ("recommend batch x100", "/api/recommend-communities/batch", {"requests": [REQUIREMENT] * 100}),
+]
+
+
+def run(client, path, body, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        response = client.post(path, json=body)
+    return (time.perf_counter() - start) / number * 1000, response
+
+
+if __name__ == "__main__":
+    app = FastAPI()
+    for module in (community_score, circle_score, recommendation):
+        app.include_router(module.router, prefix="/api")
+    client = TestClient(app)
+
+    print(f"orjson {'installed' if orjson else 'not installed, using json'}")
+    for label, path, body in CASES:
+        number = 50 if "500" in label or "batch" in label else 300
+        settings.FAST_JSON_RESPONSE = False
+        standard_ms, standard = run(client, path, body, number)
+        settings.FAST_JSON_RESPONSE = True
+        fast_ms, fast = run(client, path, body, number)
+        same = json.loads(standard.content) == json.loads(fast.content)
+        print(
+            f"{label:<24}standard {standard_ms:8.2f} ms   fast {fast_ms:8.2f} ms"
+            f"   x{standard_ms / fast_ms:4.1f}{'' if same else '   (输出不一致!)'}"
+        )
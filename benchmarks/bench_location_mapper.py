@@ -0,0 +1,54 @@
+"""
+LocationMapper 地名抽取的回归检查与微基准：
+先校验精确匹配、别名、容错匹配的结果，以及不应产生区域过滤的普通语句（误命中会把全市查询
+收窄到单个板块），再分别测量精确匹配与容错匹配路径的耗时。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_location_mapper
+"""
+
+import timeit
+
+from app.services.location_mapper import LocationMapper
+from benchmarks.bench_nlp_parser_local import CORPUS
+
+# (文本, 期望的区名, 期望的板块名)
+EXPECTED = [
+    ("浦东张江附近三房", ["浦东"], ["张江"]),
+    ("想在闸北公园旁边", [], ["闸北公园"]),
+    ("小陆家嘴的江景房", [], ["陆家嘴"]),
+    ("陆家咀附近的老公房", [], ["陆家嘴"]),  # 三字名称的常见错字走别名表
+    # 容错匹配：替换（四字及以上）、相邻交换、多一个字
+    ("人民广厂附近", [], ["人民广场"]),
+    ("陆嘴家附近", [], ["陆家嘴"]),
+    ("植园物旁边", [], ["植物园"]),
+    ("陆家家嘴附近", [], ["陆家嘴"]),
+    # 普通语句，不应命中任何地名
+    ("离动物园近一点", [], []),
+    ("给大学生住", [], []),
+    ("想要大学附近的房子", [], []),
+    ("没有特别的要求，离地铁近就行", [], []),
+]
+
+
+def check(mapper: LocationMapper):
+    for text, districts, circles in EXPECTED:
+        got = mapper.extract(text)
+        assert got == (districts, circles), f"{text}: {got} != {(districts, circles)}"
+
+
+def bench(label, func, number=2000):
+    seconds = timeit.timeit(func, number=number)
+    print(f"{label:<32}{seconds / number * 1e6:8.2f} µs/call")
+
+
+if __name__ == "__main__":
+    mapper = LocationMapper(fuzzy=True)
+    check(mapper)
+    print(f"{len(EXPECTED)} extraction checks passed")
+
+    exact = [t for t in CORPUS if any(mapper.extract(t))]
+    plain = "，".join(t for t in CORPUS if not any(mapper.extract(t))) * 3
+    bench("exact (corpus)", lambda: [mapper.extract(t) for t in exact], 500)
+    bench("fuzzy hit (陆嘴家)", lambda: mapper.extract("想在陆嘴家附近买房"))
+    bench(f"no location ({len(plain)} chars)", lambda: mapper.extract(plain))
@@ -0,0 +1,95 @@
+"""
+nlp_parser_local 预算/卧室抽取的微基准：对比逐个 re.search 的旧实现与预编译单次扫描实现。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_nlp_parser_local
+"""
+
+import re
+import timeit
+
+from app.config.keyword_config import BEDROOM_MAP
+from app.services.nlp_parser_local import extract_bedroom_count, extract_budget
+
+CORPUS = [
+    "浦东张江附近，三房，预算800万左右，最好靠近地铁",
+    "想在徐汇买个两室一厅，预算500-600万，孩子明年上小学",
+    "静安或者黄浦，预算在1000万以内，要求房龄新一点，小区安静",
+    "闵行七宝，3房2卫，总价700到850万之间，老人同住需要电梯",
+    "预算5000000到8000000，宝山顾村，两房就够了，通勤方便",
+    "2018年以后的次新房，杨浦五角场附近，四居室，预算1200w",
+    "首套刚需，单身，一个人住，一房或者两房都可以，预算300万",
+    "改善型需求，浦东联洋花木一带，大三房，绿化好，预算1500万上下",
+    "嘉定新城或者南翔，投资用，出租方便，预算400万左右",
+    "长宁古北，对口好学校，带娃，两口子加父母三代同住，预算两千万以内",
+    "没有特别的要求，离地铁近就行",
+    "松江大学城附近，预算在350~420万，2房",
+]
+
+LEGACY_BEDROOM_PATTERNS = [
+    r"([一二两三四五六七八九])房",
+    r"([一二两三四五六七八九])室",
+    r"([一二两三四五六七八九])居",
+    r"(\d)房",
+    r"(\d)室",
+    r"(\d)居",
+]
+
+LEGACY_BUDGET_PATTERNS = [
+    r"(?P<min>\d{2,4})\s*[万wW]?\s*(?:到|[-~—～至])\s*(?P<max>\d{2,4})\s*[万wW]?(?:之间|以内|左右)?",
+    r"(?P<min>\d{5,8})\s*(?:到|[-~—～至])\s*(?P<max>\d{5,8})",
+    r"(?:预算[是为在]?)?\s*(?P<value>\d{2,4})\s*[万wW]?\s*(?:左右|以内)?",
+    r"(?P<value>\d{6,8})(?![万wW])",
+]
+
+
+def legacy_extract_budget(text):
+    for pattern in LEGACY_BUDGET_PATTERNS:
+        match = re.search(pattern, text)
+        if not match:
+            continue
+        group = match.groupdict()
+        if "min" in group and "max" in group:
+            min_val, max_val = int(group["min"]), int(group["max"])
+            if min_val > 10000 and max_val > 10000:
+                min_val //= 10000
+                max_val //= 10000
+            return min_val, max_val
+        if "value" in group:
+            value = int(group["value"])
+            if value > 10000:
+                value //= 10000
+            delta = max(50, int(value * 0.1))
+            return value - delta, value + delta
+    return None, None
+
+
+def legacy_extract_bedroom_count(text):
+    for pattern in LEGACY_BEDROOM_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            val = match.group(1)
+            if val in BEDROOM_MAP:
+                return BEDROOM_MAP[val]
+            elif val.isdigit():
+                return int(val)
+    return None
+
+
+def bench(label, func, number=2000):
+    seconds = timeit.timeit(lambda: [func(t) for t in CORPUS], number=number)
+    per_call_us = seconds / (number * len(CORPUS)) * 1e6
+    print(f"{label:<32}{per_call_us:8.2f} µs/call")
+
+
+if __name__ == "__main__":
+    for text in CORPUS:
+        old = (legacy_extract_budget(text), legacy_extract_bedroom_count(text))
+        new = (extract_budget(text), extract_bedroom_count(text))
+        mark = "  " if old == new else "≠ "
+        print(f"{mark}{text[:24]:<26} legacy={old} new={new}")
+    print()
+    bench("legacy extract_budget", legacy_extract_budget)
+    bench("compiled extract_budget", extract_budget)
+    bench("legacy extract_bedroom_count", legacy_extract_bedroom_count)
+    bench("compiled extract_bedroom_count", extract_bedroom_count)
@@ -0,0 +1,64 @@
+"""
+NLP 进程池吞吐基准：同一批文本分别交给 1/2/4/8 个工作进程并发解析（parse_text_sync +
+infer_weights_sync），与线程池对比。执行器使用默认的 NLP_INLINE_MAX_CHARS：
+线程模式下短文本内联执行，进程模式下全部交给工作进程。吞吐能否随进程数增长取决于机器核数。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_nlp_workers [文本数，默认 400]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+from app.core.config import settings
+from app.services.nlp_executor import NLPExecutor
+from app.services.nlp_parser_local import parse_text_sync
+from app.services.weight_infer_local import infer_weights_sync
+from benchmarks.bench_nlp_parser_local import CORPUS
+
+# 每条约 500 字，接近用户粘贴的长描述；短文本为接口的常见输入
+LONG_TEXTS = ["，".join(CORPUS[i:] + CORPUS[:i]) for i in range(len(CORPUS))]
+SHORT_TEXTS = list(CORPUS)
+
+
+async def run(executor: NLPExecutor, corpus, n: int) -> float:
+    texts = [corpus[i % len(corpus)] for i in range(n)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(executor.run(parse_text_sync, t) for t in texts),
+        *(executor.run(infer_weights_sync, t) for t in texts),
+    )
+    return time.perf_counter() - start
+
+
+def bench(label: str, executor: NLPExecutor, n: int):
+    executor.start()
+    try:
+        asyncio.run(run(executor, LONG_TEXTS, len(LONG_TEXTS)))  # 预热
+        long_seconds = asyncio.run(run(executor, LONG_TEXTS, n))
+        short_seconds = asyncio.run(run(executor, SHORT_TEXTS, n))
+    finally:
+        executor.shutdown()
+    print(
+        f"{label:<20}{n / long_seconds:10.1f} long/s"
+        f"{n / short_seconds:12.1f} short/s"
+    )
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    print(
+        f"cpu_count={os.cpu_count()}, texts={n}, "
+        f"long_len={sum(map(len, LONG_TEXTS)) // len(LONG_TEXTS)}, "
+        f"short_len={sum(map(len, SHORT_TEXTS)) // len(SHORT_TEXTS)}, "
+        f"inline_max_chars={settings.NLP_INLINE_MAX_CHARS}"
+    )
+    bench("thread x4", NLPExecutor(4, settings.NLP_INLINE_MAX_CHARS), n)
+    for processes in (1, 2, 4, 8):
+        bench(
+            f"process x{processes}",
+            NLPExecutor(1, settings.NLP_INLINE_MAX_CHARS, processes=processes),
+            n,
+        )
@@ -0,0 +1,137 @@
+"""
+评分详情查询的基准：对比三种实现在 1 / 50 / 500 个 id 下的延迟
+  - sequential：原实现，评分、价格两条查询依次执行，再用 {**score, **price} 合并
+  - concurrent：两条查询在连接池的两个连接上并发执行
+  - joined：当前实现，unnest ... WITH ORDINALITY + LEFT JOIN 一次查询完成
+需要可用的数据库（读取 .env 中的 DB_* 配置），直接调用 _fetch_* 绕过结果缓存。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_score_services [重复次数，默认 20]
+"""
+
+import asyncio
+import sys
+import time
+
+from app.db import Database
+from app.services.circle_score_service import (
+    PRICE_COLUMNS as CIRCLE_PRICE_COLUMNS,
+    SCORE_COLUMNS as CIRCLE_SCORE_COLUMNS,
+    CircleScoreService,
+)
+from app.services.community_score_service import (
+    COMMUNITY_COLUMNS,
+    PRICE_COLUMNS as COMMUNITY_PRICE_COLUMNS,
+    RANKING_COLUMNS,
+    CommunityScoreService,
+)
+
+SIZES = (1, 50, 500)
+
+SQL_COMMUNITY_SCORE = f"""
+SELECT {", ".join(f"c.{k}" for k in COMMUNITY_COLUMNS)},
+       {", ".join(f"r.{k}" for k in RANKING_COLUMNS)}
+FROM public.v_community c
+JOIN public.community_scores_ranking r ON c.id = r.id
+WHERE c.id = ANY($1)
+"""
+SQL_COMMUNITY_PRICE = f"""
+SELECT {", ".join(COMMUNITY_PRICE_COLUMNS)}
+FROM public.v_community_listing_price_mom
+WHERE community_id = ANY($1)
+"""
+SQL_CIRCLE_SCORE = f"""
+SELECT {", ".join(CIRCLE_SCORE_COLUMNS)}
+FROM public.circle_score_rankings
+WHERE circle_code = ANY($1)
+"""
+SQL_CIRCLE_PRICE = f"""
+SELECT {", ".join(CIRCLE_PRICE_COLUMNS)}
+FROM public.v_circle_avg_price_monthly_ratio
+WHERE circle_code = ANY($1)
+"""
+
+
+def merge(ids, score_rows, price_rows, score_key, price_key):
+    score_map = {row[score_key]: dict(row) for row in score_rows}
+    price_map = {row[price_key]: dict(row) for row in price_rows}
+    return [{**score_map.get(i, {}), **price_map.get(i, {})} for i in ids]
+
+
+def two_query_variants(sql_score, sql_price, score_key, price_key):
+    async def sequential(ids):
+        score_rows = await Database.fetch_all(sql_score, [ids])
+        price_rows = await Database.fetch_all(sql_price, [ids])
+        return merge(ids, score_rows, price_rows, score_key, price_key)
+
+    async def concurrent(ids):
+        score_rows, price_rows = await asyncio.gather(
+            Database.fetch_all(sql_score, [ids]), Database.fetch_all(sql_price, [ids])
+        )
+        return merge(ids, score_rows, price_rows, score_key, price_key)
+
+    return sequential, concurrent
+
+
+async def bench(label, variants, all_ids, repeat):
+    for size in SIZES:
+        ids = all_ids[:size]
+        expected = None
+        for name, func in variants:
+            result = await func(ids)  # 预热，并校验各实现结果一致
+            expected = expected if expected is not None else result
+            same = "" if result == expected else "  (结果不一致!)"
+            start = time.perf_counter()
+            for _ in range(repeat):
+                await func(ids)
+            ms = (time.perf_counter() - start) / repeat * 1000
+            print(f"{label:<10}{size:>5} ids  {name:<12}{ms:9.2f} ms{same}")
+
+
+async def main(repeat):
+    await Database.init_pool()
+    try:
+        community_ids = [
+            r["id"] for r in await Database.fetch_all(
+                "SELECT id FROM public.community_scores_ranking LIMIT $1", [max(SIZES)]
+            )
+        ]
+        circle_codes = [
+            r["circle_code"] for r in await Database.fetch_all(
+                "SELECT circle_code FROM public.circle_score_rankings LIMIT $1", [max(SIZES)]
+            )
+        ]
+        await bench(
+            "community",
+            [
+                *zip(
+                    ("sequential", "concurrent"),
+                    two_query_variants(
+                        SQL_COMMUNITY_SCORE, SQL_COMMUNITY_PRICE, "id", "community_id"
+                    ),
+                ),
+                ("joined", CommunityScoreService()._fetch_communities_scores),
+            ],
+            community_ids,
+            repeat,
+        )
+        await bench(
+            "circle",
+            [
+                *zip(
+                    ("sequential", "concurrent"),
+                    two_query_variants(
+                        SQL_CIRCLE_SCORE, SQL_CIRCLE_PRICE, "circle_code", "circle_code"
+                    ),
+                ),
+                ("joined", CircleScoreService()._fetch_circles_scores),
+            ],
+            circle_codes,
+            repeat,
+        )
+    finally:
+        await Database.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,63 @@
+"""
+推荐排序 SQL 回退路径的检查：把连接池限制为 1 个连接，对每种查询形态连续执行两次
+（第二次必然复用第一次释放回池的同一连接），分别在带 / 不带 work_mem 事务的情况下，
+确认语句在连接复用后仍可执行、两次结果一致（固定 seed），并打印每次的耗时。
+需要可用的数据库（读取 .env 中的 DB_* 配置），直接调用 _recommend_sql 绕过评分引擎与结果缓存。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_sql_fallback
+"""
+
+import asyncio
+import time
+
+from app.core.config import settings
+from app.db import Database
+from app.models.requirement import ParsedRequirement
+from app.services import circle_recommender, recommender
+
+REQUIREMENTS = {
+    "不限区域 + 价格区间": ParsedRequirement(budget=[300, 800]),
+    "不限区域 + 房型": ParsedRequirement(budget=[300, 800], bedroom_count=2),
+    "指定板块 + 房型": ParsedRequirement(
+        budget=[300, 800], bedroom_count=2, circle_codes=["611900148"]
+    ),
+    "指定区 + 价格区间": ParsedRequirement(budget=[300, 800], district_codes=["310115"]),
+}
+
+
+async def run_twice(label, func):
+    results = []
+    for i in range(2):
+        start = time.perf_counter()
+        rows = await func()
+        print(f"{label:<28} run {i + 1}: {len(rows):3d} rows {(time.perf_counter() - start) * 1000:8.2f} ms")
+        results.append(rows)
+    assert results[0] == results[1], f"{label}: results differ between runs"
+
+
+async def main():
+    settings.DB_POOL_MIN_SIZE = settings.DB_POOL_MAX_SIZE = 1
+    await Database.init_pool()
+    try:
+        for work_mem in ("", "64MB"):
+            settings.DB_RANKING_WORK_MEM = work_mem
+            suffix = f" (work_mem={work_mem})" if work_mem else ""
+            for label, requirement in REQUIREMENTS.items():
+                query = recommender._build_query(requirement, seed="check")
+                await run_twice(
+                    f"小区 {label}{suffix}",
+                    lambda: recommender.RecommenderService()._recommend_sql(query),
+                )
+                query = circle_recommender._build_query(requirement, seed="check")
+                await run_twice(
+                    f"板块 {label}{suffix}",
+                    lambda: circle_recommender.circle_recommender_service._recommend_sql(query),
+                )
+        print(Database.statement_stats())
+    finally:
+        await Database.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
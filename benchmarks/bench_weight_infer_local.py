@@ -0,0 +1,64 @@
+"""
+weight_infer_local 的微基准：对比逐评分项 `word in keywords` 的旧实现、
+倒排索引 + NumPy 计数的单条实现，以及 infer_weights_batch 批量实现。
+分词结果预先算好，只比较权重计算本身。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_weight_infer_local
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from app.config.keyword_config import WEIGHT_KEYWORDS
+from app.services.segmenter import segment
+from app.services.weight_infer_local import (
+    DEFAULT_BASE_SCORE,
+    SCORE_KEYS,
+    infer_weights_batch,
+    infer_weights_locally,
+    stretch_weights,
+)
+from benchmarks.bench_nlp_parser_local import CORPUS
+
+
+def legacy_infer_weights(words, alpha=1):
+    raw_scores = {}
+    for score_key, keywords in WEIGHT_KEYWORDS.items():
+        matched = sum(1 for word in words if word in keywords)
+        raw_scores[score_key] = matched if matched > 0 else DEFAULT_BASE_SCORE
+    total_score = sum(raw_scores.values())
+    return stretch_weights({k: v / total_score for k, v in raw_scores.items()}, alpha)
+
+
+def report(label, seconds, n):
+    print(f"{label:<28}{seconds / n * 1e6:8.2f} µs/text")
+
+
+if __name__ == "__main__":
+    texts = CORPUS * 2000
+    words_list = [segment(t) for t in texts]
+
+    legacy = np.array([[legacy_infer_weights(w)[k] for k in SCORE_KEYS] for w in words_list[:len(CORPUS)]])
+    batch = infer_weights_batch(texts[:len(CORPUS)], words_list=words_list[:len(CORPUS)])
+    print("max |legacy - batch| =", float(np.abs(legacy - batch).max()))
+    print()
+
+    start = time.perf_counter()
+    for words in words_list:
+        legacy_infer_weights(words)
+    report("legacy loop", time.perf_counter() - start, len(texts))
+
+    async def run_indexed():
+        for text, words in zip(texts, words_list):
+            await infer_weights_locally(text, words=words)
+
+    start = time.perf_counter()
+    asyncio.run(run_indexed())
+    report("indexed infer_weights_locally", time.perf_counter() - start, len(texts))
+
+    start = time.perf_counter()
+    infer_weights_batch(texts, words_list=words_list)
+    report("infer_weights_batch", time.perf_counter() - start, len(texts))
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from app.services.jieba_custom_dict import add_all_custom_words
+from app.services.jieba_custom_dict import init_jieba
 
 from app.api.requirement import router as requirement_router
 from app.api.weight_infer import router as weight_infer_router
@@ -12,15 +12,72 @@ from app.api.market_overview import router as market_overview_router
 from app.api.property_policy import router as property_policy_router
 from app.api.market_stats import router as market_stats_router
 from app.api.community_suggest import router as community_suggest_router
+from app.api.analyze import router as analyze_router
+from app.api.metrics import router as metrics_router
+from app.api.admin import router as admin_router
 
 from app.db import Database
+from app.core.config import settings
+from app.services.community_score_engine import community_score_engine
+from app.services.circle_score_engine import circle_score_engine
+from app.services.community_suggest_index import community_suggest_index
+from app.services.deepseek_client import deepseek_client
+from app.services.market_trend_service import MarketTrendService
+from app.services.llm_cache import llm_cache
+from app.services.nlp_executor import nlp_executor
+from app.services.data_reloader import data_reloader
+from app.utils.periodic import run_periodically
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    add_all_custom_words()  # 应用启动时自动添加所有自定义分词
+    init_jieba()  # 应用启动时加载词典并添加所有自定义分词（优先使用缓存）
+    nlp_executor.start()
     await Database.init_pool()
+    await deepseek_client.start()
+    await MarketTrendService.load_persisted()
+
+    background_tasks = []
+    if settings.SCORE_ENGINE_ENABLED:
+        for name, engine in (
+            ("community_score_engine", community_score_engine),
+            ("circle_score_engine", circle_score_engine),
+        ):
+            try:
+                await engine.load()
+            except Exception as e:
+                print(f"⚠️ {name} load failed, falling back to SQL: {e}")
+            background_tasks.append(
+                run_periodically(
+                    settings.SCORE_ENGINE_REFRESH_SECONDS,
+                    engine.load,
+                    f"{name}_refresh",
+                )
+            )
+
+    if settings.SUGGEST_INDEX_ENABLED:
+        try:
+            await community_suggest_index.load()
+        except Exception as e:
+            print(f"⚠️ community_suggest_index load failed, falling back to SQL: {e}")
+        background_tasks.append(
+            run_periodically(
+                settings.SUGGEST_INDEX_REFRESH_SECONDS,
+                community_suggest_index.load,
+                "community_suggest_index_refresh",
+            )
+        )
+
+    if settings.DATA_RELOAD_WATCH_SECONDS > 0:
+        background_tasks.append(data_reloader.watch(settings.DATA_RELOAD_WATCH_SECONDS))
+
     yield
+
+    for task in background_tasks:
+        task.cancel()
+    nlp_executor.shutdown()
+    await deepseek_client.aclose()
+    llm_cache.close()
     await Database.close_pool()
 
 
@@ -37,6 +94,9 @@ app.include_router(market_overview_router, prefix="/api")
 app.include_router(property_policy_router, prefix="/api")
 app.include_router(market_stats_router, prefix="/api")
 app.include_router(community_suggest_router, prefix="/api")
+app.include_router(analyze_router, prefix="/api")
+app.include_router(metrics_router, prefix="/api")
+app.include_router(admin_router, prefix="/api")
 
 if __name__ == "__main__":
     import uvicorn